@@ -0,0 +1,148 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from full_preprocessing_runner import clean_dataframe, smart_extract_joins
+from sql_cleaner_advanced import advanced_clean_sql
+
+# Bump when the cleaner or parser changes so cached parses are not reused
+PARSER_VERSION = "2"
+
+
+class ParseCache:
+    """Parsed joins per SQL script, keyed by the SHA-256 of the file content (SQLite file)."""
+
+    def __init__(self, path="output/sql_parse_cache.sqlite"):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS parsed_scripts (
+                content_hash TEXT,
+                parser_version TEXT,
+                joins_json TEXT,
+                parsed_at REAL,
+                PRIMARY KEY (content_hash, parser_version)
+            )
+        """)
+        self._db.commit()
+
+    def get(self, content_hash):
+        row = self._db.execute(
+            "SELECT joins_json FROM parsed_scripts WHERE content_hash = ? AND parser_version = ?",
+            (content_hash, PARSER_VERSION),
+        ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put_many(self, items):
+        self._db.executemany(
+            "INSERT OR REPLACE INTO parsed_scripts VALUES (?, ?, ?, ?)",
+            [(content_hash, PARSER_VERSION, json.dumps(joins), time.time()) for content_hash, joins in items],
+        )
+        self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+
+def find_sql_files(input_dir, extensions=(".sql",)):
+    paths = []
+    for root, _, files in os.walk(input_dir):
+        for name in files:
+            if name.lower().endswith(extensions):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+def parse_sql_text(sql_text):
+    """Clean (fast mode, every statement) + parse one script; runs in a worker process."""
+    return smart_extract_joins(advanced_clean_sql(sql_text, fast=True))
+
+
+def _parse_worker(sql_text):
+    try:
+        return parse_sql_text(sql_text), None
+    except Exception as e:
+        return None, str(e)
+
+
+def batch_parse_sql_files(input_dir, cache_path="output/sql_parse_cache.sqlite", max_workers=None):
+    """
+    Cleans and parses every .sql file under input_dir.
+    Scripts whose content hash is already in the parse cache are not reparsed; the rest
+    are parsed in a process pool. Returns (joins_df, status_df), one joins row per join
+    with a source_file column, one status row per file.
+    """
+    cache = ParseCache(cache_path) if cache_path else None
+    paths = find_sql_files(input_dir)
+    print(f" Found {len(paths)} SQL files under {input_dir}")
+
+    results = {}
+    to_parse = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        content_hash = hashlib.sha256(raw).hexdigest()
+        cached = cache.get(content_hash) if cache else None
+        if cached is not None:
+            results[path] = (cached, None, "Cached")
+        else:
+            to_parse.append((path, content_hash, raw.decode('utf-8', errors='replace')))
+
+    print(f" {len(paths) - len(to_parse)} cached, parsing {len(to_parse)}")
+    if to_parse:
+        parsed = []
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            outcomes = executor.map(_parse_worker, [text for _, _, text in to_parse], chunksize=8)
+            for (path, content_hash, _), (joins, error) in zip(to_parse, outcomes):
+                if error is None:
+                    results[path] = (joins, None, "Parsed")
+                    parsed.append((content_hash, joins))
+                else:
+                    results[path] = ([], error, "Failed")
+                    print(f" Failed to parse {path}: {error}")
+        if cache:
+            cache.put_many(parsed)
+
+    if cache:
+        cache.close()
+
+    join_rows = []
+    status_rows = []
+    for path in paths:
+        joins, error, status = results[path]
+        source_file = os.path.relpath(path, input_dir)
+        for join in joins:
+            join_rows.append({"source_file": source_file, **join})
+        status_rows.append({"source_file": source_file, "status": status, "joins": len(joins), "error": error or ""})
+
+    return pd.DataFrame(join_rows), pd.DataFrame(status_rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean and parse joins from every SQL script under a directory")
+    parser.add_argument("input_dir", nargs="?", default="input")
+    parser.add_argument("--output", default="output/batch_parsed_joins.xlsx")
+    parser.add_argument("--cache", default="output/sql_parse_cache.sqlite", help="empty string disables the cache")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    joins_df, status_df = batch_parse_sql_files(args.input_dir, args.cache or None, args.workers)
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    if not joins_df.empty:
+        joins_df = clean_dataframe(joins_df)
+    with pd.ExcelWriter(args.output) as writer:
+        joins_df.to_excel(writer, sheet_name="joins", index=False)
+        status_df.to_excel(writer, sheet_name="files", index=False)
+
+    print(f" {len(joins_df)} joins from {len(status_df)} files saved to {args.output}")
@@ -0,0 +1,60 @@
+"""
+Throughput of advanced_clean_sql on a synthetic multi-statement ETL file:
+- default mode (grouped parse + sqlparse.format per statement)
+- fast mode (single lexing pass, collapsed output written directly)
+- fast mode streamed from a file (iter_clean_statements_from_file)
+
+Usage: python benchmarks/bench_sql_cleaner.py [--lines 2000 20000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_join_extractors import generate_sql
+from sql_cleaner_advanced import iter_clean_statements, iter_clean_statements_from_file
+
+
+def time_run(fn):
+    start = time.perf_counter()
+    n_statements = sum(1 for _ in fn())
+    return time.perf_counter() - start, n_statements
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, nargs="+", default=[2000, 20000])
+    args = parser.parse_args()
+
+    print(f"{'lines':>8} {'MB':>6} {'mode':>8} {'seconds':>9} {'MB/s':>7} {'statements':>11}")
+    for n_lines in args.lines:
+        sql_text = generate_sql(n_lines)
+        size_mb = len(sql_text.encode("utf-8")) / 1e6
+
+        with tempfile.NamedTemporaryFile("w", suffix=".sql", delete=False) as f:
+            f.write(sql_text)
+            path = f.name
+
+        def stream():
+            with open(path, "r") as f:
+                yield from iter_clean_statements_from_file(f)
+
+        runs = {
+            "default": lambda: iter_clean_statements(sql_text, fast=False),
+            "fast": lambda: iter_clean_statements(sql_text, fast=True),
+            "stream": stream,
+        }
+        try:
+            for mode, fn in runs.items():
+                seconds, n_statements = time_run(fn)
+                print(f"{n_lines:>8} {size_mb:>6.2f} {mode:>8} {seconds:>9.3f} {size_mb / seconds:>7.2f} {n_statements:>11}")
+        finally:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
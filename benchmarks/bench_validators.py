@@ -0,0 +1,343 @@
+"""
+End-to-end timings of the validators against a synthetic DuckDB warehouse
+(see synthetic_warehouse.py for the generated tables).
+
+For every validator it reports
+- wall time (best of --repeat runs)
+- queries executed and rows fetched, counted by a wrapper around every pooled connection
+- peak Python heap (tracemalloc; DuckDB's own buffers are not included)
+
+and compares them against a saved baseline: wall time / peak memory beyond --tolerance,
+or any increase in queries or rows fetched, is reported as a regression (exit code 1).
+The metadata cache is cleared before each run so metadata lookups are counted too.
+
+Usage: python benchmarks/bench_validators.py [--rows 200000] [--width 20] [--skew 0.5]
+           [--null-rate 0.05] [--fanout 2] [--only skew outliers_pushdown ...]
+           [--baseline benchmarks/validator_baseline.json] [--save-baseline]
+"""
+import argparse
+import contextlib
+import importlib.machinery
+import importlib.util
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import warnings
+
+import pandas as pd
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from connection_pool import (ConnectionPool, close_all_pools, get_pooled_connection, local_connection_factory,
+                             register_connection_pool)
+from metadata_cache import get_metadata_cache
+from synthetic_warehouse import (DIM_TABLE, ENUM_VALUES, FACT_TABLE, SCHEMA, WarehouseSpec,
+                                 build_synthetic_warehouse, generated_columns)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "validator_baseline.json")
+
+
+def load_repo_module(name, file_name):
+    # Several validators live in files without a .py extension
+    path = os.path.join(REPO_DIR, file_name)
+    loader = importlib.machinery.SourceFileLoader(name, path)
+    spec = importlib.util.spec_from_loader(name, loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    return module
+
+
+# -------------------------
+# Query / row counting
+# -------------------------
+class QueryCounter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.queries = 0
+            self.rows = 0
+
+    def add(self, queries=0, rows=0):
+        with self._lock:
+            self.queries += queries
+            self.rows += rows
+
+
+class CountingCursor:
+    def __init__(self, cursor, counter):
+        self._cursor = cursor
+        self._counter = counter
+
+    def execute(self, query, *args):
+        self._counter.add(queries=1)
+        self._cursor.execute(query, *args)
+        return self
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._counter.add(rows=1)
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._cursor.fetchmany(*args)
+        self._counter.add(rows=len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._counter.add(rows=len(rows))
+        return rows
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._counter.add(rows=1)
+            yield row
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class CountingConnection:
+    def __init__(self, conn, counter):
+        self._conn = conn
+        self._counter = counter
+
+    def cursor(self):
+        return CountingCursor(self._conn.cursor(), self._counter)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def install_counting_pool(config_path, database_path, database, counter, pool_size=4):
+    local_factory = local_connection_factory("duckdb", database_path, database, SCHEMA)
+
+    def factory():
+        conn, db, schema = local_factory()
+        return CountingConnection(conn, counter), db, schema
+
+    return register_connection_pool(config_path, ConnectionPool(factory, max_size=pool_size))
+
+
+# -------------------------
+# Benchmarks
+# -------------------------
+def build_benchmarks(workdir, config_path, database, spec):
+    """[(name, fn)]; each fn runs one validator end to end against the synthetic warehouse."""
+    skew_outlier = load_repo_module("run_skew_and_outlier_validation",
+                                    "run_skew_and_outlier_validation.py")
+    bad_data = load_repo_module("bad_data_repat_check", "bad_data_repat_check")
+    pattern = load_repo_module("pattern", "pattern")
+    enum_rules = load_repo_module("enum_rules", "enum_rules")
+    compare_counts = load_repo_module("compare_counts", "compare_counts")
+    join_validator = load_repo_module("join_validator", "join_validator.py")
+
+    columns = generated_columns(spec.width)
+    numeric = [name for name, kind in columns if kind == "NUM"]
+    categorical = [name for name, kind in columns if kind in ("CAT", "CODE")]
+    emails = [name for name, kind in columns if kind == "EMAIL"]
+    codes = [name for name, kind in columns if kind == "CODE"]
+
+    enum_excel = os.path.join(workdir, "enum_rules.xlsx")
+    pd.DataFrame([{"Schema": SCHEMA, "Table": FACT_TABLE, "Column": col, "Allowed_Values": ", ".join(ENUM_VALUES)}
+                  for col in codes]).to_excel(enum_excel, index=False)
+
+    count_tables = pd.DataFrame([{"Database": database, "Schema": SCHEMA, "Table": table}
+                                 for table in (FACT_TABLE, DIM_TABLE)])
+    count_excel = os.path.join(workdir, "count_tables.xlsx")
+
+    fact = f"{database}.{SCHEMA}.{FACT_TABLE}"
+    dim = f"{database}.{SCHEMA}.{DIM_TABLE}"
+    joins = [
+        {"left_table": fact, "right_table": dim, "left_keys": ["DIM_ID"], "right_keys": ["ID"],
+         "join_type": "INNER JOIN"},
+        {"left_table": dim, "right_table": fact, "left_keys": ["ID"], "right_keys": ["DIM_ID"],
+         "join_type": "INNER JOIN"},
+    ]
+
+    def on_connection(fn):
+        def run():
+            conn, *_ = get_pooled_connection(config_path)
+            try:
+                return fn(conn)
+            finally:
+                conn.close()
+        return run
+
+    def count_comparison():
+        # run_count_comparison writes its results back into the input workbook
+        count_tables.to_excel(count_excel, index=False)
+        compare_counts.run_count_comparison(count_excel, config_path)
+
+    return [
+        ("skew", on_connection(lambda conn: skew_outlier.get_skew_data_with_query(
+            conn, database, SCHEMA, FACT_TABLE, categorical))),
+        ("outliers_pandas", on_connection(lambda conn: skew_outlier.get_outlier_data_with_query(
+            conn, database, SCHEMA, FACT_TABLE, numeric, mode="pandas"))),
+        ("outliers_pushdown", on_connection(lambda conn: skew_outlier.get_outlier_data_with_query(
+            conn, database, SCHEMA, FACT_TABLE, numeric, mode="pushdown"))),
+        ("outliers_sketch", on_connection(lambda conn: skew_outlier.get_outlier_data_with_query(
+            conn, database, SCHEMA, FACT_TABLE, numeric, mode="sketch"))),
+        ("bad_data", on_connection(lambda conn: bad_data.run_bad_data_check(
+            conn, database, SCHEMA, FACT_TABLE))),
+        ("bad_data_single_scan", on_connection(lambda conn: bad_data.run_bad_data_check(
+            conn, database, SCHEMA, FACT_TABLE, single_scan=True))),
+        ("pattern", on_connection(lambda conn: pattern.run_pattern_validation(
+            conn, database, SCHEMA, FACT_TABLE, emails))),
+        ("joins", on_connection(lambda conn: join_validator.validate_joins_from_list(joins, conn))),
+        ("joins_unfused", on_connection(lambda conn: join_validator.validate_joins_from_list(
+            joins, conn, fused=False))),
+        ("enum", lambda: enum_rules.run_enum_validation(config_path, enum_excel)),
+        ("count_comparison", count_comparison),
+    ]
+
+
+def run_benchmark(fn, counter, repeat, verbose=False):
+    best = None
+    peak = 0
+    for _ in range(repeat):
+        get_metadata_cache().invalidate()
+        counter.reset()
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        with contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        elapsed = time.perf_counter() - start
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        best = elapsed if best is None else min(best, elapsed)
+    return {
+        "wall_s": round(best, 4),
+        "queries": counter.queries,
+        "rows_fetched": counter.rows,
+        "peak_mb": round(peak / 1e6, 2),
+    }
+
+
+# -------------------------
+# Baseline comparison
+# -------------------------
+def compare_to_baseline(results, baseline, tolerance):
+    """[(name, metric, baseline_value, current_value)] for every regression."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric in ("wall_s", "peak_mb"):
+            if current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append((name, metric, previous[metric], current[metric]))
+        for metric in ("queries", "rows_fetched"):
+            if current[metric] > previous[metric]:
+                regressions.append((name, metric, previous[metric], current[metric]))
+    return regressions
+
+
+def _delta(current, previous):
+    if previous is None:
+        return ""
+    if not previous:
+        return "  (new)" if current else ""
+    return f" ({(current - previous) / previous:+.0%})"
+
+
+def print_results(results, baseline):
+    print(f"\n{'validator':<22} {'wall_s':>18} {'queries':>14} {'rows_fetched':>20} {'peak_mb':>16}")
+    for name, r in results.items():
+        b = baseline.get(name, {})
+        cells = [f"{r[m]}{_delta(r[m], b.get(m))}" for m in ("wall_s", "queries", "rows_fetched", "peak_mb")]
+        print(f"{name:<22} {cells[0]:>18} {cells[1]:>14} {cells[2]:>20} {cells[3]:>16}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=WarehouseSpec.rows)
+    parser.add_argument("--width", type=int, default=WarehouseSpec.width)
+    parser.add_argument("--skew", type=float, default=WarehouseSpec.skew, help="share of rows on the top CAT value")
+    parser.add_argument("--null-rate", type=float, default=WarehouseSpec.null_rate)
+    parser.add_argument("--fanout", type=int, default=WarehouseSpec.fanout, help="DIM rows per join key")
+    parser.add_argument("--seed", type=int, default=WarehouseSpec.seed)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="+", help="benchmark names to run (default: all)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write this run's results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative increase in wall time and peak memory")
+    parser.add_argument("--verbose", action="store_true", help="show the validators' own output")
+    args = parser.parse_args()
+    baseline_path = os.path.abspath(args.baseline)
+
+    spec = WarehouseSpec(args.rows, args.width, args.skew, args.null_rate, args.fanout, args.seed)
+    workdir = tempfile.mkdtemp(prefix="bench_validators_")
+    database_path = os.path.join(workdir, "WAREHOUSE.duckdb")
+
+    print(f" Building synthetic warehouse: {spec.to_dict()}")
+    start = time.perf_counter()
+    database = build_synthetic_warehouse(database_path, spec)
+    print(f" Built in {time.perf_counter() - start:.1f}s")
+
+    config_path = os.path.join(workdir, "config.json")
+    with open(config_path, "w") as f:
+        json.dump({"backend": "duckdb", "database_path": database_path, "database": database, "schema": SCHEMA}, f)
+    counter = QueryCounter()
+    install_counting_pool(config_path, database_path, database, counter)
+
+    baseline = {}
+    if os.path.exists(baseline_path):
+        with open(baseline_path, "r") as f:
+            saved = json.load(f)
+        if saved.get("spec") == spec.to_dict():
+            baseline = saved.get("results", {})
+        else:
+            print(f" Baseline {baseline_path} was recorded for {saved.get('spec')}; not comparing")
+
+    # enum and count comparison write their reports relative to the working directory
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        benchmarks = build_benchmarks(workdir, config_path, database, spec)
+        if args.only:
+            benchmarks = [(name, fn) for name, fn in benchmarks if name in args.only]
+
+        # pd.read_sql on a plain DB-API connection warns on every call
+        warnings.filterwarnings("ignore", message="pandas only supports SQLAlchemy")
+        tracemalloc.start()
+        results = {}
+        for name, fn in benchmarks:
+            print(f" Running {name} ...")
+            results[name] = run_benchmark(fn, counter, args.repeat, args.verbose)
+        tracemalloc.stop()
+    finally:
+        os.chdir(cwd)
+        close_all_pools()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_results(results, baseline)
+
+    if args.save_baseline:
+        with open(baseline_path, "w") as f:
+            json.dump({"spec": spec.to_dict(), "results": results}, f, indent=2)
+        print(f"\n Baseline saved to {baseline_path}")
+        return 0
+
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    for name, metric, previous, current in regressions:
+        print(f" REGRESSION {name}.{metric}: {previous} -> {current}")
+    if baseline and not regressions:
+        print("\n No regressions against the baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
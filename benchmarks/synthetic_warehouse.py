@@ -0,0 +1,106 @@
+"""
+Synthetic warehouse for the validator benchmarks, built in a local DuckDB file.
+
+"DB"."BENCH"."FACT"  rows rows, ID + DIM_ID + width generated columns cycling through
+                     NUM_i (doubles with ~1% IQR outliers), CAT_i (top value 'A' on a
+                     `skew` share of rows), CODE_i (enum with ~1% 'UNKNOWN'), EMAIL_i
+                     (~2% fail the email pattern) and TXT_i (~1% repeated-character values)
+"DB"."BENCH"."DIM"   rows // 10 keys, each repeated `fanout` times; ~5% of FACT.DIM_ID
+                     values have no DIM row
+
+Every generated column is NULL on a `null_rate` share of rows. Values come from hashes
+of the row number, so the same spec always builds the same tables.
+"""
+import os
+from dataclasses import asdict, dataclass
+
+SCHEMA = "BENCH"
+FACT_TABLE = "FACT"
+DIM_TABLE = "DIM"
+COLUMN_KINDS = ("NUM", "CAT", "CODE", "EMAIL", "TXT")
+ENUM_VALUES = ("OPEN", "CLOSED", "PENDING")
+
+
+@dataclass
+class WarehouseSpec:
+    rows: int = 200000
+    width: int = 20
+    skew: float = 0.5
+    null_rate: float = 0.05
+    fanout: int = 2
+    seed: int = 0
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def _uniform(spec, salt):
+    # deterministic value in [0, 1) per row and salt
+    return f"((hash(r, {spec.seed * 1000 + salt}) % 1000000) / 1000000.0)"
+
+
+def _nullable(spec, salt, expr):
+    if spec.null_rate <= 0:
+        return expr
+    return f"CASE WHEN {_uniform(spec, salt + 500)} < {spec.null_rate} THEN NULL ELSE {expr} END"
+
+
+def generated_columns(width):
+    """[(column_name, kind)] for the FACT table's generated columns."""
+    return [(f"{COLUMN_KINDS[i % len(COLUMN_KINDS)]}_{i + 1}", COLUMN_KINDS[i % len(COLUMN_KINDS)])
+            for i in range(width)]
+
+
+def _column_expr(spec, kind, salt):
+    u = _uniform(spec, salt)
+    if kind == "NUM":
+        base = f"({_uniform(spec, salt + 100)} + {_uniform(spec, salt + 200)} + {u}) * 100"
+        expr = f"CASE WHEN {_uniform(spec, salt + 300)} < 0.01 THEN {base} * 50 ELSE {base} END"
+    elif kind == "CAT":
+        expr = f"CASE WHEN {u} < {spec.skew} THEN 'A' ELSE 'V' || CAST(hash(r, {salt}) % 50 AS VARCHAR) END"
+    elif kind == "CODE":
+        values = ", ".join(f"'{v}'" for v in ENUM_VALUES)
+        expr = (f"CASE WHEN {u} < 0.01 THEN 'UNKNOWN' "
+                f"ELSE [{values}][CAST(hash(r, {salt}) % {len(ENUM_VALUES)} AS INTEGER) + 1] END")
+    elif kind == "EMAIL":
+        expr = f"CASE WHEN {u} < 0.02 THEN 'user' || r || '@invalid' ELSE 'user' || r || '@example.com' END"
+    else:
+        expr = f"CASE WHEN {u} < 0.01 THEN 'xxxxx' ELSE 'T' || CAST(hash(r, {salt}) % 100000 AS VARCHAR) END"
+    return _nullable(spec, salt, expr)
+
+
+def build_synthetic_warehouse(path, spec):
+    """
+    Writes the FACT and DIM tables for spec into a fresh DuckDB file at path.
+    The DuckDB catalog (the "database" in DB.SCHEMA.TABLE names) is the file name
+    without its extension.
+    """
+    import duckdb
+
+    if os.path.exists(path):
+        os.remove(path)
+    dim_keys = max(1, spec.rows // 10)
+
+    fact_columns = [
+        "r AS ID",
+        f"CAST(floor({_uniform(spec, 1)} * {dim_keys} * 1.05) AS BIGINT) AS DIM_ID",
+    ]
+    fact_columns += [f"{_column_expr(spec, kind, 10 + i)} AS {name}"
+                     for i, (name, kind) in enumerate(generated_columns(spec.width))]
+
+    conn = duckdb.connect(path)
+    try:
+        conn.execute(f"CREATE SCHEMA {SCHEMA}")
+        conn.execute(f"""
+            CREATE TABLE {SCHEMA}.{FACT_TABLE} AS
+            SELECT {", ".join(fact_columns)}
+            FROM range({spec.rows}) t(r)
+        """)
+        conn.execute(f"""
+            CREATE TABLE {SCHEMA}.{DIM_TABLE} AS
+            SELECT k AS ID, j AS VERSION_NO, 'D' || CAST(k AS VARCHAR) AS LABEL
+            FROM range({dim_keys}) t(k), range({max(1, spec.fanout)}) f(j)
+        """)
+    finally:
+        conn.close()
+    return os.path.splitext(os.path.basename(path))[0]
@@ -0,0 +1,405 @@
+import atexit
+import functools
+import json
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+from query_profiler import ProfiledConnection
+
+# Fixed contract for every entry point: always six fields, unused ones are None.
+ConnectionInfo = namedtuple("ConnectionInfo", ["conn", "database", "schema", "table_name", "schema1", "table_name1"])
+
+
+def normalize_connection_result(result):
+    """
+    get_snowflake_connection has returned a bare connection, a 3-tuple and a
+    6-tuple over time; pad whatever comes back to a ConnectionInfo.
+    """
+    if not isinstance(result, tuple):
+        result = (result,)
+    result = tuple(result)[:len(ConnectionInfo._fields)]
+    return ConnectionInfo(*(result + (None,) * (len(ConnectionInfo._fields) - len(result))))
+
+
+# DB-API error classes that mean the session itself is unusable (drivers name them alike)
+CONNECTION_ERRORS = {"OperationalError", "InterfaceError"}
+
+
+def is_connection_error(exc):
+    return any(cls.__name__ in CONNECTION_ERRORS for cls in type(exc).__mro__)
+
+
+def _guarded(owner, fn, wrapper=None, wrapped=None):
+    """fn, recording connection-level errors on owner; a call returning wrapped returns wrapper."""
+    @functools.wraps(fn)
+    def call(*args, **kwargs):
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            owner._note_error(e)
+            raise
+        return wrapper if wrapped is not None and result is wrapped else result
+    return call
+
+
+class PooledCursor:
+    """
+    Cursor handed out by a pooled connection; close() parks it for reuse instead of closing it.
+    A connection-level error from any cursor call marks its connection broken (see PooledConnection).
+    """
+
+    def __init__(self, owner, cursor):
+        self._owner = owner
+        self._cursor = cursor
+
+    def close(self):
+        # parking twice would hand one raw cursor to two callers
+        if self._cursor is not None:
+            self._owner._park_cursor(self._cursor)
+            self._cursor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __getattr__(self, name):
+        if self._cursor is None:
+            raise AttributeError(f"Cursor is closed (accessing {name!r})")
+        attr = getattr(self._cursor, name)
+        if not callable(attr):
+            return attr
+        # execute() returning the raw cursor hands back this wrapper instead
+        return _guarded(self._owner, attr, self, self._cursor)
+
+    def __iter__(self):
+        rows = iter(self._cursor)
+        while True:
+            try:
+                row = next(rows)
+            except StopIteration:
+                return
+            except Exception as e:
+                self._owner._note_error(e)
+                raise
+            yield row
+
+
+class PooledConnection:
+    """
+    Wraps a raw DB-API connection checked out of a ConnectionPool.
+    - cursor() reuses cursors that callers already closed
+    - close() returns the session to the pool instead of logging out, unless a call on it
+      or its cursors raised a connection-level error (OperationalError / InterfaceError);
+      a broken session is closed and dropped from the pool instead
+    """
+
+    def __init__(self, pool, raw_conn):
+        self._pool = pool
+        self._raw = raw_conn
+        self._idle_cursors = []
+        self._released = False
+        self.broken = False
+        self.last_used = time.monotonic()
+
+    @property
+    def raw(self):
+        return self._raw
+
+    def cursor(self):
+        if self._idle_cursors:
+            cursor = self._idle_cursors.pop()
+        else:
+            cursor = _guarded(self, self._raw.cursor)()
+        return PooledCursor(self, cursor)
+
+    def _park_cursor(self, cursor):
+        self._idle_cursors.append(cursor)
+
+    def _note_error(self, exc):
+        if is_connection_error(exc):
+            self.broken = True
+
+    def close(self):
+        if not self._released:
+            self._released = True
+            self._pool.release(self, broken=self.broken)
+
+    def _close_raw(self):
+        for cursor in self._idle_cursors:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+        self._idle_cursors = []
+        try:
+            self._raw.close()
+        except Exception:
+            pass
+
+    def __getattr__(self, name):
+        attr = getattr(self._raw, name)
+        return _guarded(self, attr) if callable(attr) else attr
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of warehouse sessions.
+    - factory() returns whatever get_snowflake_connection returns (or a bare DB-API connection)
+    - at most max_size sessions are open at once; acquire() waits when all are checked out
+    - idle sessions older than health_check_interval seconds are probed with health_check_query
+    """
+
+    def __init__(self, factory, max_size=4, health_check_query="SELECT 1",
+                 health_check_interval=300, acquire_timeout=None):
+        self.factory = factory
+        self.max_size = max_size
+        self.health_check_query = health_check_query
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+        self._idle = []
+        self._open_count = 0
+        self._info_template = None
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def _create(self):
+        info = normalize_connection_result(self.factory())
+        self._info_template = info._replace(conn=None)
+        return PooledConnection(self, info.conn)
+
+    def _is_healthy(self, pooled):
+        if time.monotonic() - pooled.last_used < self.health_check_interval:
+            return True
+        try:
+            cur = pooled.raw.cursor()
+            cur.execute(self.health_check_query)
+            cur.fetchall()
+            cur.close()
+            return True
+        except Exception:
+            return False
+
+    def acquire(self):
+        deadline = None if self.acquire_timeout is None else time.monotonic() + self.acquire_timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                if self._idle:
+                    pooled = self._idle.pop()
+                    break
+                if self._open_count < self.max_size:
+                    self._open_count += 1
+                    pooled = None
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"No pooled connection available within {self.acquire_timeout}s")
+                self._condition.wait(remaining)
+
+        try:
+            if pooled is not None and not self._is_healthy(pooled):
+                pooled._close_raw()
+                pooled = None
+            if pooled is None:
+                pooled = self._create()
+        except Exception:
+            with self._condition:
+                self._open_count -= 1
+                self._condition.notify()
+            raise
+
+        pooled._released = False
+        return self._info_template._replace(conn=pooled)
+
+    def release(self, pooled, broken=False):
+        pooled.last_used = time.monotonic()
+        with self._condition:
+            if broken or self._closed:
+                pooled._close_raw()
+                self._open_count -= 1
+            else:
+                self._idle.append(pooled)
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self):
+        info = self.acquire()
+        try:
+            yield info
+        finally:
+            info.conn.close()
+
+    def resize(self, max_size):
+        with self._condition:
+            self.max_size = max(self.max_size, max_size)
+            self._condition.notify_all()
+
+    def close_all(self):
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._open_count -= len(idle)
+        for pooled in idle:
+            pooled._close_raw()
+
+
+# -------------------------
+# Local DB-API stand-ins
+# -------------------------
+class LocalDialectCursor:
+    """Rewrites the few Snowflake-only constructs the validators emit so DuckDB/SQLite can run them."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, query, *args):
+        query = re.sub(r'\b[\w"]+\.INFORMATION_SCHEMA\.', 'INFORMATION_SCHEMA.', query, flags=re.IGNORECASE)
+        # SAMPLE BERNOULLI (p) [SEED (s)] -> DuckDB's TABLESAMPLE p% (bernoulli[, s])
+        query = re.sub(
+            r'\bSAMPLE\s+(BERNOULLI|SYSTEM)\s*\(([\d.]+)\)(?:\s*SEED\s*\((\d+)\))?',
+            lambda m: f"TABLESAMPLE {m.group(2)}% ({m.group(1).lower()}{', ' + m.group(3) if m.group(3) else ''})",
+            query, flags=re.IGNORECASE,
+        )
+        self._cursor.execute(query, *args)
+        return self
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class LocalDialectConnection:
+    def __init__(self, conn, cursor_setup=()):
+        self._conn = conn
+        # DuckDB cursors are separate sessions, so temp macros go on every cursor
+        self._cursor_setup = cursor_setup
+
+    def cursor(self):
+        cursor = self._conn.cursor()
+        for statement in self._cursor_setup:
+            cursor.execute(statement)
+        return LocalDialectCursor(cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+DUCKDB_MACROS = [
+    "CREATE OR REPLACE TEMP MACRO to_varchar(x) AS CAST(x AS VARCHAR)",
+    # Snowflake literals escape backslashes; undo that before matching
+    "CREATE OR REPLACE TEMP MACRO regexp_like(s, p) AS regexp_full_match(CAST(s AS VARCHAR), replace(p, '\\\\', '\\'))",
+    # Snowflake casts numbers/dates to text for string functions; DuckDB needs it spelled out
+    "CREATE OR REPLACE TEMP MACRO trim(x) AS ltrim(rtrim(CAST(x AS VARCHAR))), "
+    "(x, c) AS ltrim(rtrim(CAST(x AS VARCHAR), c), c)",
+    "CREATE OR REPLACE TEMP MACRO length(x) AS char_length(CAST(x AS VARCHAR))",
+    "CREATE OR REPLACE TEMP MACRO substr(x, i) AS substring(CAST(x AS VARCHAR), i), "
+    "(x, i, n) AS substring(CAST(x AS VARCHAR), i, n)",
+]
+
+
+def local_connection_factory(backend, database_path, database=None, schema=None):
+    def factory():
+        cursor_setup = ()
+        if backend == "duckdb":
+            import duckdb
+            conn = duckdb.connect(database_path)
+            cursor_setup = DUCKDB_MACROS
+        elif backend == "sqlite":
+            import sqlite3
+            conn = sqlite3.connect(database_path, check_same_thread=False)
+            conn.create_function("TO_VARCHAR", 1, lambda v: None if v is None else str(v))
+            conn.create_function("REGEXP_LIKE", 2, lambda v, p: None if v is None else
+                                 re.fullmatch(p.replace("\\\\", "\\"), str(v)) is not None)
+        else:
+            raise ValueError(f"Unsupported local backend: {backend}")
+        return LocalDialectConnection(conn, cursor_setup), database, schema
+    return factory
+
+
+# -------------------------
+# Shared pools per config file
+# -------------------------
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _build_pool(config_path):
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+
+    backend = config.get("backend", "snowflake")
+    if backend == "snowflake":
+        from snowflake_connection import get_snowflake_connection
+
+        def factory():
+            return get_snowflake_connection(config_path)
+    elif backend == "extracts":
+        # Parquet/CSV files behind a DuckDB catalog of views
+        from offline_engine import build_extract_catalog
+        factory = local_connection_factory("duckdb", build_extract_catalog(config),
+                                           config.get("database") or "EXTRACTS", config.get("schema") or "PUBLIC")
+    else:
+        factory = local_connection_factory(backend, config["database_path"],
+                                           config.get("database"), config.get("schema"))
+
+    def profiled_factory():
+        # Queries are recorded only while a query profile is active (see query_profiler)
+        info = normalize_connection_result(factory())
+        return info._replace(conn=ProfiledConnection(info.conn, set_query_tag=(backend == "snowflake")))
+
+    return ConnectionPool(
+        profiled_factory,
+        max_size=config.get("pool_size", 4),
+        health_check_interval=config.get("pool_health_check_interval", 300),
+        acquire_timeout=config.get("pool_acquire_timeout"),
+    )
+
+
+def get_connection_pool(config_path, min_size=None):
+    key = os.path.abspath(config_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = _build_pool(config_path)
+    if min_size:
+        pool.resize(min_size)
+    return pool
+
+
+def register_connection_pool(config_path, pool):
+    """
+    Installs a prebuilt pool for config_path (benchmarks and local harnesses that wrap
+    their connections); entry points calling get_pooled_connection(config_path) then use
+    it. Any pool already registered for that path is closed.
+    """
+    key = os.path.abspath(config_path)
+    with _pools_lock:
+        previous = _pools.get(key)
+        _pools[key] = pool
+    if previous is not None and previous is not pool:
+        previous.close_all()
+    return pool
+
+
+def get_pooled_connection(config_path):
+    """
+    Drop-in replacement for get_snowflake_connection with a fixed contract:
+    returns ConnectionInfo(conn, database, schema, table_name, schema1, table_name1).
+    conn.close() hands the session back to the shared pool.
+    """
+    return get_connection_pool(config_path).acquire()
+
+
+@atexit.register
+def close_all_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
@@ -1,6 +1,10 @@
 import os
 import pandas as pd
-from snowflake_connection import get_snowflake_connection
+from connection_pool import get_pooled_connection
+from metadata_cache import get_metadata_cache
+from query_scheduler import backend_for_config, run_queries
+from query_cache import normalize_sql, open_query_cache_from_config
+from query_profiler import finish_query_profile, profiled, start_query_profile_from_config
 import re
 
 def smart_load_joins(input_file):
@@ -51,18 +55,8 @@ def safe_full_column(alias, colname):
 def check_table_exists(conn, database, schema, table_name):
     schema = schema.upper()
     table_name = table_name.upper()
-    query = f"""
-    SELECT COUNT(*)
-    FROM {database}.INFORMATION_SCHEMA.TABLES
-    WHERE TABLE_SCHEMA = '{schema}'
-    AND TABLE_NAME = '{table_name}'
-    """
-    print(f"\n🔍 Checking Table Existence with Query:\n{query}")
-    cur = conn.cursor()
-    cur.execute(query)
-    exists = cur.fetchone()[0] > 0
-    cur.close()
-    return exists
+    print(f"\n🔍 Checking Table Existence: {database}.{schema}.{table_name}")
+    return get_metadata_cache().table_exists(conn, database, schema, table_name)
 
 def run_anti_join_validation(left_table, right_table, left_keys, right_keys):
     join_condition = ' AND '.join([
@@ -116,6 +110,39 @@ def run_null_key_validation(left_table, left_keys):
     """
     return query
 
+def run_fused_join_validation(left_table, right_table, left_keys, right_keys):
+    # Missing records, join explosion and null keys from one pass over each side:
+    # both sides are pre-aggregated by key, so per key k the join contributes
+    # l_cnt * r_cnt rows and missing rows are l_cnt where no right key matches.
+    left_select = ', '.join([f"{safe_full_column('a', l)} AS k{i}" for i, l in enumerate(left_keys)])
+    left_group = ', '.join([safe_full_column('a', l) for l in left_keys])
+    right_select = ', '.join([f"{safe_full_column('b', r)} AS k{i}" for i, r in enumerate(right_keys)])
+    right_group = ', '.join([safe_full_column('b', r) for r in right_keys])
+
+    join_condition = ' AND '.join([f"l.k{i} = r.k{i}" for i in range(len(left_keys))])
+    null_conditions = ' OR '.join([f"l.k{i} IS NULL" for i in range(len(left_keys))])
+
+    query = f"""
+    WITH l AS (
+        SELECT {left_select}, COUNT(*) AS l_cnt
+        FROM {left_table} a
+        GROUP BY {left_group}
+    ),
+    r AS (
+        SELECT {right_select}, COUNT(*) AS r_cnt
+        FROM {right_table} b
+        GROUP BY {right_group}
+    )
+    SELECT
+        COALESCE(SUM(CASE WHEN r.r_cnt IS NULL THEN l.l_cnt ELSE 0 END), 0) AS missing_records,
+        SUM(CASE WHEN r.r_cnt IS NOT NULL THEN l.l_cnt * r.r_cnt - 1 END) AS join_explosion,
+        COALESCE(SUM(CASE WHEN {null_conditions} THEN l.l_cnt ELSE 0 END), 0) AS null_join_keys
+    FROM l
+    LEFT JOIN r
+      ON {join_condition}
+    """
+    return query
+
 def run_spot_check_validation(left_table, right_table, left_keys, right_keys):
     join_condition = ' AND '.join([
         f"{safe_full_column('a', l)} = {safe_full_column('b', r)}"
@@ -130,77 +157,173 @@ def run_spot_check_validation(left_table, right_table, left_keys, right_keys):
     """
     return query
 
-def validate_joins_from_list(joins_list, conn):
+def plan_join_validation(join, conn, fused=True, include_check_queries=False):
+    """
+    Works out what to run for one join without running it.
+    Returns (skip_result, None) for joins that are skipped, else (None, plan) where
+    plan["queries"] lists (label, sql) pairs in execution order.
+    """
+    left_table = join['left_table']
+    right_table = join['right_table']
+    left_keys = join['left_keys']
+    right_keys = join['right_keys']
+    join_type = join['join_type']
+
+    print(f"\n🔄 Validating Join: {left_table} {join_type} {right_table} ON {', '.join(left_keys)}")
+
+    if join_type != 'INNER JOIN':
+        print("⚠️ Skipped - Non-Inner Join")
+        return {**join, "Validation_Status": "Skipped - Non-Inner Join"}, None
+
+    try:
+        left_db, left_schema, left_table_name = smart_split_table(left_table)
+        right_db, right_schema, right_table_name = smart_split_table(right_table)
+    except ValueError as e:
+        print(f"⚠️ Skipped - {e}")
+        return {**join, "Validation_Status": f"Skipped - {e}"}, None
+
+    left_exists = check_table_exists(conn, left_db, left_schema, left_table_name)
+    right_exists = check_table_exists(conn, right_db, right_schema, right_table_name)
+
+    if not (left_exists and right_exists):
+        print("⚠️ Skipped - Temp/Derived Table Not Found")
+        return {**join, "Validation_Status": "Skipped - Temp/Derived Table (Not Found)"}, None
+
+    anti_join_query = run_anti_join_validation(left_table, right_table, left_keys, right_keys)
+    multiplicity_query = run_join_multiplicity_validation(left_table, right_table, left_keys, right_keys)
+    null_query = run_null_key_validation(left_table, left_keys)
+    check_queries = {
+        "Anti_Join_Query": anti_join_query,
+        "Multiplicity_Query": multiplicity_query,
+        "Null_Key_Query": null_query,
+    }
+
+    if fused:
+        fused_query = run_fused_join_validation(left_table, right_table, left_keys, right_keys)
+        queries = [("Fused Join", fused_query)]
+        query_columns = {"Fused_Query": fused_query, **(check_queries if include_check_queries else {})}
+    else:
+        queries = [("Anti-Join", anti_join_query), ("Multiplicity", multiplicity_query), ("Null Key", null_query)]
+        query_columns = check_queries
+
+    return None, {
+        "join": join,
+        "fused": fused,
+        "queries": queries,
+        "query_columns": query_columns,
+        "spot_check_query": run_spot_check_validation(left_table, right_table, left_keys, right_keys),
+    }
+
+def build_join_result(plan, query_rows):
+    """query_rows: fetched rows per plan query, in plan order"""
+    if plan["fused"]:
+        missing_count, explosion, null_count = query_rows[0][0]
+    else:
+        missing_count = query_rows[0][0][0]
+        explosion = query_rows[1][0][0]
+        null_count = query_rows[2][0][0]
+
+    return {
+        **plan["join"],
+        **plan["query_columns"],
+        "Spot_Check_Query": plan["spot_check_query"],
+        "Missing_Records": missing_count,
+        "Join_Explosion": explosion or 0,
+        "Null_Join_Keys": null_count,
+        "Validation_Status": "Validated"
+    }
+
+@profiled("join")
+def validate_joins_from_list(joins_list, conn, fused=True, include_check_queries=False,
+                             backend=None, max_in_flight=8, cache=None):
+    """
+    fused=True runs one combined query per join (run_fused_join_validation);
+    fused=False runs the separate anti-join, multiplicity and null-key queries.
+    include_check_queries=True also records the separate queries' SQL in the
+    output when running fused, for audit.
+    backend: optional query_scheduler backend; when given, every join's queries are
+    submitted together through AsyncQueryScheduler (max_in_flight at a time)
+    instead of one after another on conn. Results stay in join order.
+    cache: optional query_cache.QueryResultCache; queries already answered for the
+    same tables at the same version are served from it instead of being run.
+    """
     results = []
+    plans = []
     for join in joins_list:
-        left_table = join['left_table']
-        right_table = join['right_table']
-        left_keys = join['left_keys']
-        right_keys = join['right_keys']
-        join_type = join['join_type']
-
-        print(f"\n🔄 Validating Join: {left_table} {join_type} {right_table} ON {', '.join(left_keys)}")
-
-        if join_type != 'INNER JOIN':
-            results.append({**join, "Validation_Status": "Skipped - Non-Inner Join"})
-            print("⚠️ Skipped - Non-Inner Join")
+        skip_result, plan = plan_join_validation(join, conn, fused, include_check_queries)
+        results.append(skip_result)
+        plans.append(plan)
+
+    # Per plan, one slot per query; cache hits are filled in up front and a query
+    # repeated by several joins in this list runs once
+    plan_outcomes = [[None] * len(plan["queries"]) if plan else None for plan in plans]
+    versions = [None] * len(plans)
+    pending = []
+    first_seen = {}
+    duplicates = []
+    for idx, plan in enumerate(plans):
+        if plan is None:
             continue
-
-        try:
-            left_db, left_schema, left_table_name = smart_split_table(left_table)
-            right_db, right_schema, right_table_name = smart_split_table(right_table)
-        except ValueError as e:
-            results.append({**join, "Validation_Status": f"Skipped - {e}"})
-            print(f"⚠️ Skipped - {e}")
-            continue
-
-        left_exists = check_table_exists(conn, left_db, left_schema, left_table_name)
-        right_exists = check_table_exists(conn, right_db, right_schema, right_table_name)
-
-        if not (left_exists and right_exists):
-            results.append({**join, "Validation_Status": "Skipped - Temp/Derived Table (Not Found)"})
-            print("⚠️ Skipped - Temp/Derived Table Not Found")
+        if cache is not None:
+            versions[idx] = cache.table_version_token(conn, [plan["join"]["left_table"], plan["join"]["right_table"]])
+        for q_idx, (label, sql) in enumerate(plan["queries"]):
+            if cache is not None:
+                hit, rows = cache.get(sql, versions[idx])
+                if hit:
+                    print(f"\n📄 {label} Query served from cache")
+                    plan_outcomes[idx][q_idx] = rows
+                    continue
+            seen_key = (normalize_sql(sql), versions[idx])
+            if seen_key in first_seen:
+                duplicates.append(((idx, q_idx), first_seen[seen_key]))
+                continue
+            first_seen[seen_key] = (idx, q_idx)
+            pending.append((idx, q_idx))
+
+    if backend is not None:
+        print(f"\n📄 Submitting {len(pending)} validation queries ({max_in_flight} in flight)")
+        outcomes = run_queries(backend, [plans[idx]["queries"][q_idx][1] for idx, q_idx in pending], max_in_flight)
+        for (idx, q_idx), outcome in zip(pending, outcomes):
+            plan_outcomes[idx][q_idx] = outcome
+    else:
+        for idx, plan in enumerate(plans):
+            plan_pending = [q_idx for p_idx, q_idx in pending if p_idx == idx]
+            if not plan_pending:
+                continue
+            cur = conn.cursor()
+            try:
+                for q_idx in plan_pending:
+                    label, sql = plan["queries"][q_idx]
+                    print(f"\n📄 Executing {label} Query:\n{sql}")
+                    cur.execute(sql)
+                    plan_outcomes[idx][q_idx] = cur.fetchall()
+            except Exception as e:
+                plan_outcomes[idx][q_idx] = e
+            finally:
+                cur.close()
+
+    for (idx, q_idx), (src_idx, src_q_idx) in duplicates:
+        plan_outcomes[idx][q_idx] = plan_outcomes[src_idx][src_q_idx]
+
+    if cache is not None:
+        for idx, q_idx in pending:
+            rows = plan_outcomes[idx][q_idx]
+            if rows is not None and not isinstance(rows, Exception):
+                cache.put(plans[idx]["queries"][q_idx][1], versions[idx], rows)
+
+    for idx, (plan, outcome) in enumerate(zip(plans, plan_outcomes)):
+        if plan is None:
             continue
-
+        error = next((o for o in outcome if isinstance(o, Exception)), None)
         try:
-            anti_join_query = run_anti_join_validation(left_table, right_table, left_keys, right_keys)
-            multiplicity_query = run_join_multiplicity_validation(left_table, right_table, left_keys, right_keys)
-            null_query = run_null_key_validation(left_table, left_keys)
-            spot_check_query = run_spot_check_validation(left_table, right_table, left_keys, right_keys)
-
-            cur = conn.cursor()
-
-            print(f"\n📄 Executing Anti-Join Query:\n{anti_join_query}")
-            cur.execute(anti_join_query)
-            missing_count = cur.fetchone()[0]
-
-            print(f"\n📄 Executing Multiplicity Query:\n{multiplicity_query}")
-            cur.execute(multiplicity_query)
-            explosion = cur.fetchone()[0] or 0
-
-            print(f"\n📄 Executing Null Key Query:\n{null_query}")
-            cur.execute(null_query)
-            null_count = cur.fetchone()[0]
-
-            cur.close()
-
-            validation_result = {
-                **join,
-                "Anti_Join_Query": anti_join_query,
-                "Multiplicity_Query": multiplicity_query,
-                "Null_Key_Query": null_query,
-                "Spot_Check_Query": spot_check_query,
-                "Missing_Records": missing_count,
-                "Join_Explosion": explosion,
-                "Null_Join_Keys": null_count,
-                "Validation_Status": "Validated"
-            }
-            results.append(validation_result)
-
-            print("✅ Validation Success")
-
+            if error is not None:
+                raise error
+            if any(o is None for o in outcome):
+                raise RuntimeError("Validation query did not run")
+            results[idx] = build_join_result(plan, outcome)
+            print(f"✅ Validation Success: {plan['join']['left_table']} -> {plan['join']['right_table']}")
         except Exception as e:
-            results.append({**join, "Validation_Status": f"Failed - {str(e)}"})
+            results[idx] = {**plan["join"], "Validation_Status": f"Failed - {str(e)}"}
             print(f"❌ Validation Failed: {e}")
 
     return pd.DataFrame(results)
@@ -212,17 +335,26 @@ if __name__ == "__main__":
     print(f"\n🔵 Reading Input Excel: {input_file}")
     print(f"🔵 Output will be saved at: {output_file}")
 
-    conn, *_ = get_snowflake_connection("config.json")
+    start_query_profile_from_config("config.json")
+    try:
+        conn, *_ = get_pooled_connection("config.json")
 
-    joins_list = smart_load_joins(input_file)
+        joins_list = smart_load_joins(input_file)
 
-    result_df = validate_joins_from_list(joins_list, conn)
+        cache = open_query_cache_from_config("config.json")
+        with backend_for_config("config.json", conn) as backend:
+            result_df = validate_joins_from_list(joins_list, conn, backend=backend, cache=cache)
+        if cache is not None:
+            print(f"📦 Query cache: {cache.stats()}")
+            cache.close()
 
-    os.makedirs("output", exist_ok=True)
-    result_df = clean_dataframe(result_df)
-    result_df.to_excel(output_file, index=False)
+        os.makedirs("output", exist_ok=True)
+        result_df = clean_dataframe(result_df)
+        result_df.to_excel(output_file, index=False)
 
-    conn.close()
+        conn.close()
+    finally:
+        finish_query_profile("output")
 
     print("\n✅ Validation Completed Successfully!")
     print(f"📦 Results saved at: {output_file}")
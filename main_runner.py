@@ -4,7 +4,14 @@ from openpyxl import Workbook
 from openpyxl.utils.dataframe import dataframe_to_rows
 from sql_parser import extract_joins_from_sql
 from join_validator import validate_joins_from_list
-from snowflake_connection import get_snowflake_connection
+from connection_pool import get_pooled_connection
+from query_scheduler import backend_for_config
+from query_cache import open_query_cache_from_config
+from query_profiler import finish_query_profile, start_query_profile_from_config
+from result_fetcher import configure_fetch_limits_from_config, fetch_frame
+
+# Rows captured per validated join (the spot check query's own LIMIT)
+SPOT_CHECK_ROWS = 20
 
 def read_sql_file(file_path):
     with open(file_path, 'r') as f:
@@ -59,11 +66,17 @@ if __name__ == "__main__":
     sql_input_path = "input/your_query.sql"
     output_excel_path = "output/Join_Validation_Report.xlsx"
     config_path = "config.json"
+    max_in_flight = 8
 
     # Step 1: Connect to Snowflake
-    conn, *_ = get_snowflake_connection(config_path)
+    start_query_profile_from_config(config_path)
+    conn = cache = None
 
     try:
+        configure_fetch_limits_from_config(config_path)
+        conn, *_ = get_pooled_connection(config_path)
+        cache = open_query_cache_from_config(config_path)
+
         # Step 2: Parse SQL to extract joins
         sql_text = read_sql_file(sql_input_path)
         parsed_joins = extract_joins_from_sql(sql_text)
@@ -72,18 +85,28 @@ if __name__ == "__main__":
         validation_results = []
         spot_check_samples = []
 
+        # All INNER JOIN checks are submitted together and run max_in_flight at a time
+        inner_joins = [join for join in parsed_joins if join['join_type'] == 'INNER JOIN']
+        with backend_for_config(config_path, conn, max_in_flight) as backend:
+            validation_df = validate_joins_from_list(inner_joins, conn, backend=backend,
+                                                     max_in_flight=max_in_flight, cache=cache)
+        inner_results = iter(validation_df.to_dict(orient='records'))
+
         for idx, join in enumerate(parsed_joins, start=1):
             if join['join_type'] == 'INNER JOIN':
-                validation_df = validate_joins_from_list([join], conn)
-                validation_result = validation_df.to_dict(orient='records')[0]
+                validation_result = next(inner_results)
                 validation_results.append(validation_result)
 
                 # Spot Check Sample
                 if validation_result['Validation_Status'] == 'Validated':
-                    # Re-run spot check to capture sample data
+                    # Run the spot check query to capture sample data, within the fetch ceiling
                     try:
-                        from join_validator import run_spot_check_validation
-                        spot_check_df = run_spot_check_validation(conn, join['left_table'], join['right_table'], join['left_keys'], join['right_keys'])
+                        cur = conn.cursor()
+                        try:
+                            spot_check_df, _ = fetch_frame(cur, validation_result['Spot_Check_Query'],
+                                                           max_rows=SPOT_CHECK_ROWS)
+                        finally:
+                            cur.close()
                         spot_check_samples.append((join, spot_check_df))
                     except Exception as e:
                         print(f"⚠️ Failed to capture spot check for join {idx}: {e}")
@@ -97,5 +120,13 @@ if __name__ == "__main__":
         write_summary_to_excel(parsed_joins, validation_summary_df, spot_check_samples, output_excel_path)
 
     finally:
-        conn.close()
-        print("🔒 Snowflake connection closed.")
+        try:
+            if cache is not None:
+                print(f"📦 Query cache: {cache.stats()}")
+                cache.close()
+            if conn is not None:
+                conn.close()
+                print("🔒 Snowflake connection returned to pool.")
+        finally:
+            # failed runs write their profile too
+            finish_query_profile(os.path.dirname(output_excel_path))
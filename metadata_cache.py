@@ -0,0 +1,187 @@
+import json
+import os
+import threading
+import time
+
+# DuckDB type names as the Snowflake DATA_TYPE the validators compare against; Snowflake
+# itself never reports these, so its metadata passes through unchanged
+LOCAL_TYPE_NAMES = {
+    "BIGINT": "NUMBER", "INTEGER": "NUMBER", "SMALLINT": "NUMBER", "TINYINT": "NUMBER", "HUGEINT": "NUMBER",
+    "UBIGINT": "NUMBER", "UINTEGER": "NUMBER", "USMALLINT": "NUMBER", "UTINYINT": "NUMBER",
+    "DOUBLE": "FLOAT", "REAL": "FLOAT",
+    "VARCHAR": "TEXT",
+    "TIMESTAMP": "TIMESTAMP_NTZ", "TIMESTAMP WITH TIME ZONE": "TIMESTAMP_TZ",
+    "BLOB": "BINARY",
+}
+
+
+def snowflake_type_name(data_type):
+    name = str(data_type).upper()
+    if name.startswith("DECIMAL("):
+        return "NUMBER"
+    return LOCAL_TYPE_NAMES.get(name, data_type)
+
+
+class MetadataCache:
+    """
+    Schema-wide INFORMATION_SCHEMA cache.
+    - COLUMNS and TABLES are bulk-loaded once per database/schema
+    - table/column lookups are then served from memory
+    - optionally persisted as JSON under cache_dir; entries older than ttl_seconds are reloaded
+    """
+
+    def __init__(self, cache_dir=None, ttl_seconds=3600):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self._schemas = {}
+        self._schema_locks = {}
+        self._lock = threading.Lock()  # guards _schemas and _schema_locks only
+
+    def _is_fresh(self, entry):
+        return entry is not None and time.time() - entry["loaded_at"] < self.ttl_seconds
+
+    def _cache_file(self, database, schema):
+        return os.path.join(self.cache_dir, f"{database}.{schema}.metadata.json")
+
+    def _read_disk(self, database, schema):
+        if not self.cache_dir:
+            return None
+        path = self._cache_file(database, schema)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, database, schema, entry):
+        if not self.cache_dir:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._cache_file(database, schema)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f, default=str)
+        os.replace(tmp_path, path)
+
+    def _query_schema(self, conn, database, schema):
+        cur = conn.cursor()
+        cur.execute(f"""
+            SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE
+            FROM {database}.INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = '{schema}'
+            ORDER BY TABLE_NAME, ORDINAL_POSITION
+        """)
+        columns = {}
+        for table_name, column_name, data_type in cur.fetchall():
+            columns.setdefault(table_name, []).append([column_name, snowflake_type_name(data_type)])
+
+        try:
+            cur.execute(f"""
+                SELECT TABLE_NAME, TABLE_TYPE, ROW_COUNT, BYTES, LAST_ALTERED
+                FROM {database}.INFORMATION_SCHEMA.TABLES
+                WHERE TABLE_SCHEMA = '{schema}'
+            """)
+            tables = {
+                r[0]: {"TABLE_TYPE": r[1], "ROW_COUNT": r[2], "BYTES": r[3],
+                       "LAST_ALTERED": str(r[4]) if r[4] is not None else None}
+                for r in cur.fetchall()
+            }
+        except Exception:
+            # Engines without Snowflake's size/versioning columns
+            cur.execute(f"""
+                SELECT TABLE_NAME, TABLE_TYPE
+                FROM {database}.INFORMATION_SCHEMA.TABLES
+                WHERE TABLE_SCHEMA = '{schema}'
+            """)
+            tables = {
+                r[0]: {"TABLE_TYPE": r[1], "ROW_COUNT": None, "BYTES": None, "LAST_ALTERED": None}
+                for r in cur.fetchall()
+            }
+        cur.close()
+
+        return {"loaded_at": time.time(), "columns": columns, "tables": tables}
+
+    def _schema_lock(self, key):
+        with self._lock:
+            return self._schema_locks.setdefault(key, threading.Lock())
+
+    def load_schema(self, conn, database, schema, refresh=False):
+        key = (database, schema)
+        if not refresh:
+            with self._lock:
+                entry = self._schemas.get(key)
+            if self._is_fresh(entry):
+                return entry
+
+        # One lock per schema: a load only blocks callers waiting for the same schema
+        with self._schema_lock(key):
+            if not refresh:
+                # another thread may have loaded it while we waited
+                with self._lock:
+                    entry = self._schemas.get(key)
+                if self._is_fresh(entry):
+                    return entry
+
+                entry = self._read_disk(database, schema)
+                if self._is_fresh(entry):
+                    with self._lock:
+                        self._schemas[key] = entry
+                    return entry
+
+            print(f" Loading metadata for {database}.{schema}")
+            entry = self._query_schema(conn, database, schema)
+            with self._lock:
+                self._schemas[key] = entry
+            self._write_disk(database, schema, entry)
+            return entry
+
+    def get_columns(self, conn, database, schema, table):
+        """[(COLUMN_NAME, DATA_TYPE), ...] in ordinal order; empty when the table is unknown."""
+        entry = self.load_schema(conn, database, schema)
+        return [tuple(c) for c in entry["columns"].get(table, [])]
+
+    def get_column_names(self, conn, database, schema, table):
+        return [name for name, _ in self.get_columns(conn, database, schema, table)]
+
+    def get_column_type(self, conn, database, schema, table, column):
+        for name, data_type in self.get_columns(conn, database, schema, table):
+            if name == column:
+                return data_type
+        return None
+
+    def table_exists(self, conn, database, schema, table):
+        entry = self.load_schema(conn, database, schema)
+        return table in entry["tables"]
+
+    def get_table_info(self, conn, database, schema, table, refresh=False):
+        """TABLE_TYPE, ROW_COUNT, BYTES and LAST_ALTERED from INFORMATION_SCHEMA.TABLES, or None."""
+        entry = self.load_schema(conn, database, schema, refresh=refresh)
+        return entry["tables"].get(table)
+
+    def invalidate(self, database=None, schema=None):
+        with self._lock:
+            for key in list(self._schemas):
+                if (database is None or key[0] == database) and (schema is None or key[1] == schema):
+                    del self._schemas[key]
+
+
+_default_cache = MetadataCache()
+
+
+def get_metadata_cache():
+    return _default_cache
+
+
+def configure_metadata_cache(cache_dir=None, ttl_seconds=3600):
+    _default_cache.cache_dir = cache_dir
+    _default_cache.ttl_seconds = ttl_seconds
+    return _default_cache
+
+
+def configure_metadata_cache_from_config(config_path):
+    """Reads metadata_cache_dir / metadata_cache_ttl from config.json, if present."""
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+    return configure_metadata_cache(config.get("metadata_cache_dir"), config.get("metadata_cache_ttl", 3600))
@@ -0,0 +1,150 @@
+import argparse
+import glob
+import json
+import os
+
+EXTRACT_READERS = {
+    ".parquet": "read_parquet",
+    ".csv": "read_csv",
+    ".csv.gz": "read_csv",
+    ".tsv": "read_csv",
+}
+
+
+def _extract_suffix(path):
+    name = path.lower()
+    for suffix in sorted(EXTRACT_READERS, key=len, reverse=True):
+        if name.endswith(suffix):
+            return suffix
+    return None
+
+
+def _sql_literal(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def discover_extract_tables(directory, default_schema):
+    """{(SCHEMA, TABLE): [files]} for every extract file or part-file directory under directory."""
+    tables = {}
+    for entry in sorted(os.listdir(directory)):
+        path = os.path.join(directory, entry)
+        if os.path.isdir(path):
+            files = sorted(f for f in glob.glob(os.path.join(path, "**", "*"), recursive=True)
+                           if os.path.isfile(f) and _extract_suffix(f))
+            name = entry
+        else:
+            suffix = _extract_suffix(entry)
+            files = [path] if suffix else []
+            name = entry[:-len(suffix)] if suffix else entry
+        if files:
+            tables[(default_schema.upper(), name.upper())] = [os.path.abspath(f) for f in files]
+    return tables
+
+
+def resolve_extract_tables(settings, default_schema):
+    """{(SCHEMA, TABLE): [files]} from the directory scan plus the explicit "tables" entries."""
+    tables = {}
+    if settings.get("directory"):
+        tables.update(discover_extract_tables(settings["directory"], default_schema))
+    for name, pattern in settings.get("tables", {}).items():
+        parts = [p.strip().strip('"') for p in name.split('.')]
+        schema, table = (parts[-2], parts[-1]) if len(parts) >= 2 else (default_schema, parts[-1])
+        files = sorted(glob.glob(pattern, recursive=True)) or [pattern]
+        tables[(schema.upper(), table.upper())] = [os.path.abspath(f) for f in files]
+    return tables
+
+
+def build_extract_view_sql(schema, table, files, csv_options=None):
+    suffixes = {_extract_suffix(f) for f in files}
+    if len(suffixes) != 1 or None in suffixes:
+        raise ValueError(f"{schema}.{table}: extract files must share one format, got {sorted(map(str, suffixes))}")
+    reader = EXTRACT_READERS[suffixes.pop()]
+    file_list = "[" + ", ".join(_sql_literal(f) for f in files) + "]"
+    options = {"union_by_name": True}
+    if reader == "read_csv":
+        options.update({"header": True, **(csv_options or {})})
+    option_sql = "".join(f", {key} = {_sql_literal(value)}" for key, value in options.items())
+    return f'CREATE OR REPLACE VIEW "{schema}"."{table}" AS SELECT * FROM {reader}({file_list}{option_sql})'
+
+
+def build_extract_catalog(config):
+    """
+    (Re)creates the DuckDB catalog of extract views for a "backend": "extracts" config and
+    returns its path. The validators then run on it like on any local backend, so every
+    check gives the same frames and sheets as on Snowflake; DuckDB streams the files and
+    scans them on all cores when a check runs, so extracts need not fit in memory.
+
+    config: "database" (default EXTRACTS), "schema" (default PUBLIC) and an "extracts" block:
+    - "directory": every *.parquet / *.csv file, and every sub-directory of part files,
+      becomes a table named after it
+    - "tables": {"SCHEMA.TABLE": "path or glob", ...}
+    - "catalog_path": defaults to output/<database>.duckdb
+    - "csv_options": passed to DuckDB's read_csv, e.g. {"delim": "|"}
+    """
+    import duckdb
+
+    database = config.get("database") or "EXTRACTS"
+    default_schema = config.get("schema") or "PUBLIC"
+    settings = config.get("extracts", {})
+    catalog_path = settings.get("catalog_path") or os.path.join("output", f"{database}.duckdb")
+    # DuckDB names the catalog after the file, and the validators address tables as DB.SCHEMA.TABLE
+    if os.path.splitext(os.path.basename(catalog_path))[0] != database:
+        raise ValueError(f"catalog_path file name must be {database}.duckdb to match the database name")
+
+    tables = resolve_extract_tables(settings, default_schema)
+    if not tables:
+        raise ValueError("No extract files found; set extracts.directory or extracts.tables")
+
+    directory = os.path.dirname(catalog_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    for path in (catalog_path, f"{catalog_path}.wal"):
+        if os.path.exists(path):
+            os.remove(path)
+
+    conn = duckdb.connect(catalog_path)
+    try:
+        for schema in sorted({schema for schema, _ in tables}):
+            conn.execute(f'CREATE SCHEMA IF NOT EXISTS "{schema}"')
+        for (schema, table), files in sorted(tables.items()):
+            conn.execute(build_extract_view_sql(schema, table, files, settings.get("csv_options")))
+            print(f" {database}.{schema}.{table}: {len(files)} file(s)")
+    finally:
+        conn.close()
+    return catalog_path
+
+
+def describe_extracts(config_path):
+    """Builds the catalog for config_path and returns one row per extract table with its size."""
+    import duckdb
+
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+    catalog_path = build_extract_catalog(config)
+    conn = duckdb.connect(catalog_path, read_only=True)
+    try:
+        rows = []
+        views = conn.execute(
+            "SELECT table_schema, table_name FROM information_schema.tables ORDER BY 1, 2").fetchall()
+        for schema, table in views:
+            n_columns = conn.execute(
+                "SELECT COUNT(*) FROM information_schema.columns WHERE table_schema = ? AND table_name = ?",
+                [schema, table]).fetchone()[0]
+            n_rows = conn.execute(f'SELECT COUNT(*) FROM "{schema}"."{table}"').fetchone()[0]
+            rows.append({"Schema": schema, "Table": table, "Columns": n_columns, "Rows": n_rows})
+        return rows
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the DuckDB catalog over the extracts in a config file")
+    parser.add_argument("config", nargs="?", default="config.json")
+    args = parser.parse_args()
+
+    for row in describe_extracts(args.config):
+        print(f" {row['Schema']}.{row['Table']}: {row['Rows']:,} rows, {row['Columns']} columns")
@@ -0,0 +1,86 @@
+import math
+
+
+class TDigest:
+    """
+    Merging t-digest for streaming quantile estimates in bounded memory.
+    - Values are buffered and periodically merged into a small set of centroids
+    - Centroids near the tails stay small, so Q1/Q3 are accurate to well under 1%
+    - Memory stays at a few thousand centroids plus the buffer, however many values are added
+    """
+
+    def __init__(self, compression=200, buffer_size=5000):
+        self.compression = compression
+        self.buffer_size = buffer_size
+        self.centroids = []  # list of [mean, weight], sorted by mean
+        self.buffer = []
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        value = float(value)
+        self.buffer.append(value)
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if len(self.buffer) >= self.buffer_size:
+            self._compress()
+
+    def update(self, values):
+        for value in values:
+            if value is not None:
+                self.add(value)
+
+    def _compress(self):
+        if not self.buffer:
+            return
+
+        points = sorted(self.centroids + [[v, 1] for v in self.buffer], key=lambda c: c[0])
+        self.buffer = []
+
+        total = self.count
+        merged = [list(points[0])]
+        cumulative = 0
+        for mean, weight in points[1:]:
+            current = merged[-1]
+            proposed = current[1] + weight
+            q = (cumulative + proposed / 2) / total
+            limit = max(1, 4 * total * q * (1 - q) / self.compression)
+            if proposed <= limit:
+                current[0] += (mean - current[0]) * weight / proposed
+                current[1] = proposed
+            else:
+                cumulative += current[1]
+                merged.append([mean, weight])
+
+        self.centroids = merged
+
+    def quantile(self, q):
+        self._compress()
+        if not self.centroids:
+            return None
+        if len(self.centroids) == 1 or q <= 0:
+            return self.min if q <= 0 else self.centroids[0][0]
+        if q >= 1:
+            return self.max
+
+        target = q * self.count
+        cumulative = 0
+        previous_center, previous_mean = 0, self.min
+        for mean, weight in self.centroids:
+            center = cumulative + weight / 2
+            if target < center:
+                span = center - previous_center
+                if span <= 0:
+                    return mean
+                return previous_mean + (mean - previous_mean) * (target - previous_center) / span
+            previous_center, previous_mean = center, mean
+            cumulative += weight
+
+        span = self.count - previous_center
+        if span <= 0:
+            return self.max
+        return previous_mean + (self.max - previous_mean) * (target - previous_center) / span
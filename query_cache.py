@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+import pickle
+import re
+import sqlite3
+import threading
+import time
+import uuid
+
+from metadata_cache import get_metadata_cache
+
+
+def normalize_sql(sql):
+    """Collapses whitespace outside string literals and drops trailing semicolons."""
+    parts = re.split(r"('(?:[^']|'')*')", sql)
+    normalized = []
+    for i, part in enumerate(parts):
+        normalized.append(part if i % 2 else re.sub(r"\s+", " ", part))
+    return "".join(normalized).strip().rstrip(";").strip()
+
+
+class QueryResultCache:
+    """
+    Persistent cache of fetched query results, stored in a SQLite file.
+    - keyed by normalized SQL text plus a version token for the tables the query reads
+      (see table_version_token), so a hit means the same query against unchanged data
+    - queries whose tables have no version metadata are cached for this process only
+    - least recently used entries are evicted beyond max_entries or max_bytes
+    """
+
+    def __init__(self, path="output/query_cache.sqlite", max_entries=10000, max_bytes=512 * 1024 * 1024):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.session_id = uuid.uuid4().hex
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._refreshed_schemas = set()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS query_results (
+                cache_key TEXT PRIMARY KEY,
+                sql_text TEXT,
+                session_id TEXT,
+                payload BLOB,
+                size_bytes INTEGER,
+                created_at REAL,
+                last_access REAL
+            )
+        """)
+        # Session-scoped entries from earlier processes cannot be trusted
+        self._db.execute("DELETE FROM query_results WHERE session_id IS NOT NULL")
+        self._db.commit()
+
+    def table_version_token(self, conn, tables):
+        """
+        Version token for fully qualified DB.SCHEMA.TABLE names, built from ROW_COUNT, BYTES
+        and LAST_ALTERED. Returns None when any table lacks that metadata.
+        """
+        versions = []
+        cache = get_metadata_cache()
+        for full_name in sorted(set(t.upper() for t in tables)):
+            parts = [p.strip().strip('"') for p in full_name.split('.')]
+            if len(parts) != 3:
+                return None
+            database, schema, table = parts
+            with self._lock:
+                refresh = (database, schema) not in self._refreshed_schemas
+                self._refreshed_schemas.add((database, schema))
+            try:
+                info = cache.get_table_info(conn, database, schema, table, refresh=refresh)
+            except Exception:
+                return None
+            if not info or info.get("LAST_ALTERED") is None:
+                return None
+            versions.append([full_name, info.get("ROW_COUNT"), info.get("BYTES"), info.get("LAST_ALTERED")])
+        return json.dumps(versions, default=str)
+
+    def _key(self, sql, version_token):
+        scope = version_token if version_token is not None else f"session:{self.session_id}"
+        return hashlib.sha256(f"{scope}\n{normalize_sql(sql)}".encode("utf-8")).hexdigest()
+
+    def get(self, sql, version_token):
+        """(True, rows) on a hit, (False, None) on a miss."""
+        key = self._key(sql, version_token)
+        with self._lock:
+            row = self._db.execute("SELECT payload FROM query_results WHERE cache_key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return False, None
+            self._db.execute("UPDATE query_results SET last_access = ? WHERE cache_key = ?", (time.time(), key))
+            self._db.commit()
+            self.hits += 1
+        return True, pickle.loads(row[0])
+
+    def put(self, sql, version_token, rows):
+        key = self._key(sql, version_token)
+        payload = pickle.dumps(list(rows), protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO query_results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, normalize_sql(sql), None if version_token is not None else self.session_id,
+                 payload, len(payload), now, now),
+            )
+            self.stores += 1
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        count, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM query_results").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        removed = []
+        for key, size in self._db.execute("SELECT cache_key, size_bytes FROM query_results ORDER BY last_access"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            removed.append((key,))
+            count -= 1
+            total -= size
+        self._db.executemany("DELETE FROM query_results WHERE cache_key = ?", removed)
+        self.evictions += len(removed)
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM query_results")
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            entries, total = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM query_results").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "entries": entries,
+            "size_bytes": total,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def open_query_cache_from_config(config_path):
+    """QueryResultCache from query_cache_path / query_cache_max_entries / query_cache_max_mb, or None when unset."""
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+    path = config.get("query_cache_path")
+    if not path:
+        return None
+    return QueryResultCache(
+        path,
+        max_entries=config.get("query_cache_max_entries", 10000),
+        max_bytes=int(config.get("query_cache_max_mb", 512)) * 1024 * 1024,
+    )
@@ -0,0 +1,331 @@
+import contextvars
+import datetime
+import functools
+import hashlib
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+from query_cache import normalize_sql
+from report_writer import open_report_writer, write_df_to_sheet
+from result_fetcher import estimate_bytes
+
+# Snowflake caps QUERY_TAG at 2000 characters
+MAX_QUERY_TAG_CHARS = 2000
+UNSCOPED = "(unscoped)"
+
+_current_validator = contextvars.ContextVar("query_profile_validator", default=None)
+_current_table = contextvars.ContextVar("query_profile_table", default=None)
+
+
+@contextmanager
+def profile_scope(validator=None, table=None):
+    """
+    Attributes the queries run inside the block to validator / table (DB.SCHEMA.TABLE).
+    Scopes nest; None leaves the enclosing value in place. Worker threads start
+    unscoped, so set the scope inside the task.
+    """
+    tokens = []
+    if validator is not None:
+        tokens.append((_current_validator, _current_validator.set(validator)))
+    if table is not None:
+        tokens.append((_current_table, _current_table.set(table)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def profiled(validator):
+    """
+    Decorator form of profile_scope for validator functions; the table is taken from
+    their database / schema / table arguments when they have them.
+    """
+    def decorate(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            arguments = signature.bind_partial(*args, **kwargs).arguments
+            table = None
+            if all(arguments.get(name) for name in ("database", "schema", "table")):
+                table = f"{arguments['database']}.{arguments['schema']}.{arguments['table']}"
+            with profile_scope(validator, table):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def current_scope():
+    return _current_validator.get(), _current_table.get()
+
+
+def sql_hash(sql):
+    return hashlib.sha256(normalize_sql(sql).encode("utf-8")).hexdigest()[:16]
+
+
+class QueryProfiler:
+    """
+    Collects one record per query executed through a ProfiledConnection while it is the
+    active profiler (see start_query_profile): validator, table, SQL hash, wall time
+    (execute plus fetches), rows and approximate bytes fetched, and any error.
+    """
+
+    def __init__(self, run_id=None, application="data_validation", max_sql_chars=2000, top_n=50):
+        self.run_id = run_id or f"{datetime.datetime.now():%Y%m%d_%H%M%S}_{uuid.uuid4().hex[:6]}"
+        self.application = application
+        self.max_sql_chars = max_sql_chars
+        self.top_n = top_n
+        self.records = []
+        self._lock = threading.Lock()
+
+    def query_tag(self, validator, table):
+        tag = json.dumps({"app": self.application, "run_id": self.run_id,
+                          "validator": validator or UNSCOPED, "table": table or ""})
+        return tag[:MAX_QUERY_TAG_CHARS]
+
+    def start(self, sql):
+        validator, table = current_scope()
+        record = {
+            "Run_ID": self.run_id,
+            "Validator": validator or UNSCOPED,
+            "Table": table or "",
+            "SQL_Hash": sql_hash(sql),
+            "Started_At": datetime.datetime.now(),
+            "Wall_Seconds": 0.0,
+            "Rows": 0,
+            "Bytes": 0,
+            "Status": "Running",
+            "Error": "",
+            "SQL": sql.strip()[:self.max_sql_chars],
+        }
+        with self._lock:
+            self.records.append(record)
+        return record
+
+    def finish(self, record, elapsed, error=None):
+        with self._lock:
+            record["Wall_Seconds"] += elapsed
+            record["Status"] = "Failed" if error is not None else "Success"
+            record["Error"] = "" if error is None else str(error)
+
+    def add_fetch(self, record, rows, elapsed):
+        n_bytes = estimate_bytes(rows)
+        with self._lock:
+            record["Wall_Seconds"] += elapsed
+            record["Rows"] += len(rows)
+            record["Bytes"] += n_bytes
+
+    def queries_df(self):
+        with self._lock:
+            return pd.DataFrame([dict(r) for r in self.records])
+
+    def slowest_queries_df(self, top_n=None):
+        df = self.queries_df()
+        if df.empty:
+            return df
+        df = df.sort_values("Wall_Seconds", ascending=False).head(top_n or self.top_n).reset_index(drop=True)
+        df["Wall_Seconds"] = df["Wall_Seconds"].round(4)
+        return df
+
+    def validator_totals_df(self):
+        df = self.queries_df()
+        if df.empty:
+            return df
+        totals = df.groupby("Validator").agg(
+            Queries=("SQL_Hash", "size"),
+            Distinct_Queries=("SQL_Hash", "nunique"),
+            Total_Seconds=("Wall_Seconds", "sum"),
+            Max_Seconds=("Wall_Seconds", "max"),
+            Rows=("Rows", "sum"),
+            Bytes=("Bytes", "sum"),
+            Failed=("Status", lambda s: int((s == "Failed").sum())),
+        ).reset_index()
+        totals["Share_%"] = (100 * totals["Total_Seconds"] / totals["Total_Seconds"].sum()).round(2) \
+            if totals["Total_Seconds"].sum() else 0.0
+        totals["Total_Seconds"] = totals["Total_Seconds"].round(4)
+        totals["Max_Seconds"] = totals["Max_Seconds"].round(4)
+        return totals.sort_values("Total_Seconds", ascending=False).reset_index(drop=True)
+
+    def write_report(self, output_dir, report_format="xlsx"):
+        """
+        Writes query_profile_{run_id}: a query_profile sheet with the top_n slowest queries
+        and a validator_totals sheet. Returns the base path written.
+        """
+        base_path = os.path.join(output_dir or "", f"query_profile_{self.run_id}")
+        with open_report_writer(base_path, report_format) as wb:
+            write_df_to_sheet(wb, "query_profile", self.slowest_queries_df())
+            write_df_to_sheet(wb, "validator_totals", self.validator_totals_df())
+        return base_path
+
+
+# -------------------------
+# Active profiler for this process
+# -------------------------
+_active_profiler = None
+
+
+def start_query_profile(run_id=None, **kwargs):
+    global _active_profiler
+    _active_profiler = QueryProfiler(run_id, **kwargs)
+    return _active_profiler
+
+
+def stop_query_profile():
+    global _active_profiler
+    profiler, _active_profiler = _active_profiler, None
+    return profiler
+
+
+def get_query_profiler():
+    return _active_profiler
+
+
+def start_query_profile_from_settings(config):
+    """
+    Starts a profile when config has "query_profile": true (optional
+    "query_profile_top_n", default 50); returns it, or None.
+    """
+    if not config.get("query_profile", False):
+        return None
+    return start_query_profile(top_n=config.get("query_profile_top_n", 50))
+
+
+def start_query_profile_from_config(config_path):
+    with open(config_path, 'r') as f:
+        return start_query_profile_from_settings(json.load(f))
+
+
+def finish_query_profile(output_dir, report_format="xlsx"):
+    """Stops the active profile and writes its report; no-op when none is active."""
+    profiler = stop_query_profile()
+    if profiler is None:
+        return None
+    base_path = profiler.write_report(output_dir, report_format)
+    print(f" Query profile ({len(profiler.records)} queries) saved: {base_path}")
+    return base_path
+
+
+# -------------------------
+# Instrumented DB-API wrappers
+# -------------------------
+class ProfiledCursor:
+    """
+    Times execute (and execute_async through get_results_from_sfqid) plus every fetch,
+    and records them on the active profiler. With no active profiler it only delegates.
+    """
+
+    def __init__(self, owner, cursor):
+        self._owner = owner
+        self._cursor = cursor
+        self._record = None
+        self._profiler = None
+        self._async_started = None
+
+    def _begin(self, query):
+        self._profiler = get_query_profiler()
+        self._record = None
+        if self._profiler is None:
+            return
+        if self._owner.set_query_tag:
+            self._owner.apply_query_tag(self._cursor, self._profiler)
+        self._record = self._profiler.start(query)
+
+    def execute(self, query, *args, **kwargs):
+        self._begin(query)
+        start = time.perf_counter()
+        try:
+            self._cursor.execute(query, *args, **kwargs)
+        except Exception as e:
+            if self._record is not None:
+                self._profiler.finish(self._record, time.perf_counter() - start, e)
+            raise
+        if self._record is not None:
+            self._profiler.finish(self._record, time.perf_counter() - start)
+        return self
+
+    def execute_async(self, query, *args, **kwargs):
+        self._begin(query)
+        self._async_started = time.perf_counter()
+        return self._cursor.execute_async(query, *args, **kwargs)
+
+    def get_results_from_sfqid(self, query_id):
+        try:
+            return self._cursor.get_results_from_sfqid(query_id)
+        finally:
+            if self._record is not None and self._async_started is not None:
+                # wall time of an async query runs from submission to its results being ready
+                self._profiler.finish(self._record, time.perf_counter() - self._async_started)
+                self._async_started = None
+
+    def _fetched(self, rows, start):
+        if self._record is not None:
+            self._profiler.add_fetch(self._record, rows, time.perf_counter() - start)
+        return rows
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._fetched([row] if row is not None else [], start)
+        return row
+
+    def fetchmany(self, *args):
+        start = time.perf_counter()
+        return self._fetched(self._cursor.fetchmany(*args), start)
+
+    def fetchall(self):
+        start = time.perf_counter()
+        return self._fetched(self._cursor.fetchall(), start)
+
+    def __iter__(self):
+        rows = iter(self._cursor)
+        while True:
+            # the clock starts before next(), which is where the driver fetches
+            start = time.perf_counter()
+            try:
+                row = next(rows)
+            except StopIteration:
+                return
+            self._fetched([row], start)
+            yield row
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class ProfiledConnection:
+    """
+    Wraps a raw DB-API connection so its cursors are ProfiledCursors.
+    set_query_tag=True (Snowflake) sets QUERY_TAG on the session to the run / validator /
+    table of the next query whenever that changes, so the queries can be matched to
+    QUERY_HISTORY.
+    """
+
+    def __init__(self, conn, set_query_tag=False):
+        self._conn = conn
+        self.set_query_tag = set_query_tag
+        self._query_tag = None
+
+    def apply_query_tag(self, cursor, profiler):
+        tag = profiler.query_tag(*current_scope())
+        if tag == self._query_tag:
+            return
+        try:
+            cursor.execute("ALTER SESSION SET QUERY_TAG = '" + tag.replace("\\", "\\\\").replace("'", "\\'") + "'")
+            self._query_tag = tag
+        except Exception as e:
+            print(f" Could not set query tag: {e}")
+            self.set_query_tag = False
+
+    def cursor(self, *args, **kwargs):
+        return ProfiledCursor(self, self._conn.cursor(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
@@ -0,0 +1,121 @@
+import asyncio
+import contextvars
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from connection_pool import get_connection_pool, normalize_connection_result
+
+
+class SnowflakeAsyncBackend:
+    """
+    Submits queries with cursor.execute_async and polls the query status, so one
+    Snowflake session can carry many in-flight queries without blocking.
+    """
+
+    def __init__(self, conn, poll_interval=0.5):
+        self.conn = conn
+        self.poll_interval = poll_interval
+
+    async def run(self, query):
+        cur = self.conn.cursor()
+        try:
+            await asyncio.to_thread(cur.execute_async, query)
+            query_id = cur.sfqid
+            while True:
+                status = await asyncio.to_thread(self.conn.get_query_status_throw_if_error, query_id)
+                if not self.conn.is_still_running(status):
+                    break
+                await asyncio.sleep(self.poll_interval)
+            await asyncio.to_thread(cur.get_results_from_sfqid, query_id)
+            return await asyncio.to_thread(cur.fetchall)
+        finally:
+            cur.close()
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ThreadedCursorBackend:
+    """
+    Runs blocking DB-API execute/fetchall on worker threads, one session per query
+    from connection_factory. Works with any driver, including the local DuckDB/SQLite
+    stand-ins from connection_pool.
+    """
+
+    def __init__(self, connection_factory, max_workers=8):
+        self.connection_factory = connection_factory
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    @classmethod
+    def from_config(cls, config_path, max_workers=8):
+        pool = get_connection_pool(config_path, min_size=max_workers)
+        return cls(pool.acquire, max_workers=max_workers)
+
+    def _run_blocking(self, query):
+        conn = normalize_connection_result(self.connection_factory()).conn
+        try:
+            cur = conn.cursor()
+            cur.execute(query)
+            rows = cur.fetchall()
+            cur.close()
+            return rows
+        finally:
+            conn.close()
+
+    async def run(self, query):
+        loop = asyncio.get_running_loop()
+        # run_in_executor does not copy contextvars (asyncio.to_thread does); without the
+        # copy the query would lose its query_profiler scope
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, context.run, self._run_blocking, query)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AsyncQueryScheduler:
+    """
+    Caps in-flight queries at max_in_flight and returns results in submission order.
+    Each result is the fetched rows, or the exception raised by that query.
+    """
+
+    def __init__(self, backend, max_in_flight=8):
+        self.backend = backend
+        self.max_in_flight = max_in_flight
+
+    async def run_all(self, queries):
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        async def run_one(query):
+            async with semaphore:
+                return await self.backend.run(query)
+
+        return await asyncio.gather(*(run_one(q) for q in queries), return_exceptions=True)
+
+
+def backend_for_config(config_path, conn, max_workers=8):
+    """
+    SnowflakeAsyncBackend on conn for Snowflake configs, pooled worker threads for local
+    backends. Close it when done (both are context managers).
+    """
+    with open(config_path, 'r') as f:
+        backend = json.load(f).get("backend", "snowflake")
+    if backend == "snowflake":
+        return SnowflakeAsyncBackend(conn)
+    return ThreadedCursorBackend.from_config(config_path, max_workers)
+
+
+def run_queries(backend, queries, max_in_flight=8):
+    return asyncio.run(AsyncQueryScheduler(backend, max_in_flight).run_all(queries))
@@ -0,0 +1,287 @@
+import csv
+import datetime
+import decimal
+import math
+import os
+
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+
+CHUNK_ROWS = 10000
+PLAIN_TYPES = (str, int, float, bool, decimal.Decimal, datetime.datetime, datetime.date, datetime.time)
+
+
+def _cell_value(value):
+    if value is None:
+        return None
+    if hasattr(value, "item") and not isinstance(value, PLAIN_TYPES):
+        value = value.item()  # numpy scalars
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, PLAIN_TYPES):
+        return value
+    return str(value)
+
+
+def iter_df_rows(df):
+    """Header row, then data rows converted chunk by chunk to plain cell values."""
+    yield [str(c) for c in df.columns]
+    for start in range(0, len(df), CHUNK_ROWS):
+        for row in df.iloc[start:start + CHUNK_ROWS].itertuples(index=False, name=None):
+            yield [_cell_value(v) for v in row]
+
+
+class ReportWriter:
+    """Base for per-table report outputs; one write_sheet call per sheet, close() to finish."""
+
+    def __init__(self, base_path):
+        self.base_path = base_path
+        self.sheetnames = []
+
+    def write_sheet(self, sheet_name, df):
+        stream = self.open_sheet(sheet_name, list(df.columns))
+        for start in range(0, len(df), CHUNK_ROWS):
+            stream.append_rows(df.iloc[start:start + CHUNK_ROWS].itertuples(index=False, name=None))
+        stream.close()
+
+    def open_sheet(self, sheet_name, columns):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def abort(self):
+        """Called instead of close() when the report body raised; nothing half-written is saved."""
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class _ExcelSheetStream:
+    def __init__(self, ws):
+        self.ws = ws
+
+    def append_rows(self, rows):
+        for row in rows:
+            self.ws.append([_cell_value(v) for v in row])
+
+    def close(self):
+        pass
+
+
+class ExcelReportWriter(ReportWriter):
+    """
+    Streams sheets into an openpyxl write-only workbook ({base_path}.xlsx).
+    - rows go to disk as they are appended, so memory stays flat for large samples
+    - with preserve_existing, sheets of an existing workbook that were not rewritten are
+      copied over (read-only, row by row) on close, like the old load_workbook update
+    """
+
+    def __init__(self, base_path, preserve_existing=True):
+        super().__init__(base_path)
+        self.path = report_output_path(base_path, "xlsx")
+        self.preserve_existing = preserve_existing
+        self.wb = Workbook(write_only=True)
+
+    def open_sheet(self, sheet_name, columns):
+        if sheet_name in self.sheetnames:
+            previous = self.wb[sheet_name]
+            previous.close()
+            self.wb.remove(previous)
+            self.sheetnames.remove(sheet_name)
+        ws = self.wb.create_sheet(title=sheet_name)
+        self.sheetnames.append(sheet_name)
+        ws.append([str(c) for c in columns])
+        return _ExcelSheetStream(ws)
+
+    def _copy_untouched_sheets(self):
+        if not (self.preserve_existing and os.path.exists(self.path)):
+            return
+        existing = load_workbook(self.path, read_only=True, data_only=True)
+        try:
+            preserved = 0
+            for name in existing.sheetnames:
+                if name in self.sheetnames:
+                    continue
+                target = self.wb.create_sheet(title=name, index=preserved)
+                for row in existing[name].iter_rows(values_only=True):
+                    target.append(row)
+                preserved += 1
+        finally:
+            existing.close()
+
+    def close(self):
+        if self.wb is None:
+            return
+        self._copy_untouched_sheets()
+        if not self.wb.sheetnames:
+            self.wb.create_sheet(title="empty")
+        tmp_path = f"{self.path}.tmp"
+        self.wb.save(tmp_path)
+        os.replace(tmp_path, self.path)
+        self.wb = None
+        print(f" Report saved: {self.path}")
+
+    def abort(self):
+        if self.wb is not None:
+            # finish the write-only sheets' temp files; nothing is saved
+            for ws in self.wb.worksheets:
+                ws.close()
+        self.wb = None
+
+
+class _CsvSheetStream:
+    def __init__(self, path, columns):
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(columns)
+
+    def append_rows(self, rows):
+        self.writer.writerows([_cell_value(v) for v in row] for row in rows)
+
+    def close(self):
+        self.file.close()
+
+
+class CsvReportWriter(ReportWriter):
+    """One {base_path}/{sheet}.csv per sheet."""
+
+    def open_sheet(self, sheet_name, columns):
+        os.makedirs(self.base_path, exist_ok=True)
+        path = os.path.join(self.base_path, f"{sheet_name}.csv")
+        if sheet_name not in self.sheetnames:
+            self.sheetnames.append(sheet_name)
+        return _CsvSheetStream(path, [str(c) for c in columns])
+
+
+def _parquet_schema(df):
+    """
+    Arrow schema keeping each column's native type; columns pyarrow cannot type as a
+    whole (mixed Python types, or nothing but nulls) are stored as strings.
+    """
+    import pyarrow as pa
+
+    fields = []
+    for col in df.columns:
+        try:
+            arrow_type = pa.array(df[col], from_pandas=True).type
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            arrow_type = pa.string()
+        if pa.types.is_null(arrow_type):
+            arrow_type = pa.string()
+        fields.append(pa.field(str(col), arrow_type))
+    return pa.schema(fields)
+
+
+def _arrow_table(chunk, schema):
+    import pyarrow as pa
+
+    arrays = []
+    for field, col in zip(schema, chunk.columns):
+        series = chunk[col]
+        if pa.types.is_string(field.type) and series.dtype == object:
+            values = (_cell_value(v) for v in series)
+            arrays.append(pa.array([None if v is None else str(v) for v in values], type=pa.string()))
+        else:
+            arrays.append(pa.array(series, type=field.type, from_pandas=True))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+class _ParquetSheetStream:
+    def __init__(self, path, columns, schema=None):
+        self.path = path
+        self.columns = columns
+        self.schema = schema  # taken from the first chunk when not given
+        self.writer = None
+
+    def append_rows(self, rows):
+        self.append_frame(pd.DataFrame([[_cell_value(v) for v in row] for row in rows], columns=self.columns))
+
+    def append_frame(self, chunk):
+        import pyarrow.parquet as pq
+
+        if chunk.empty:
+            return
+        if self.schema is None:
+            self.schema = _parquet_schema(chunk)
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.path, self.schema)
+        self.writer.write_table(_arrow_table(chunk, self.schema))
+
+    def close(self):
+        import pyarrow.parquet as pq
+
+        if self.writer is not None:
+            self.writer.close()
+        elif self.schema is not None:
+            pq.write_table(self.schema.empty_table(), self.path)
+        else:
+            pd.DataFrame(columns=self.columns).to_parquet(self.path, index=False)
+
+
+class ParquetReportWriter(ReportWriter):
+    """One {base_path}/{sheet}.parquet per sheet (needs pyarrow); columns keep their dtypes."""
+
+    def write_sheet(self, sheet_name, df):
+        # the whole frame is at hand, so every chunk is written with the same schema
+        stream = self.open_sheet(sheet_name, list(df.columns), schema=_parquet_schema(df))
+        for start in range(0, len(df), CHUNK_ROWS):
+            stream.append_frame(df.iloc[start:start + CHUNK_ROWS])
+        stream.close()
+
+    def open_sheet(self, sheet_name, columns, schema=None):
+        os.makedirs(self.base_path, exist_ok=True)
+        path = os.path.join(self.base_path, f"{sheet_name}.parquet")
+        if sheet_name not in self.sheetnames:
+            self.sheetnames.append(sheet_name)
+        return _ParquetSheetStream(path, [str(c) for c in columns], schema)
+
+
+REPORT_WRITERS = {
+    "xlsx": ExcelReportWriter,
+    "csv": CsvReportWriter,
+    "parquet": ParquetReportWriter,
+}
+
+
+def open_report_writer(base_path, report_format="xlsx", **kwargs):
+    """
+    base_path has no extension: xlsx writes {base_path}.xlsx, csv/parquet write
+    one file per sheet under the {base_path}/ directory.
+    """
+    if report_format not in REPORT_WRITERS:
+        raise ValueError(f"Unsupported report format: {report_format}")
+    return REPORT_WRITERS[report_format](base_path, **kwargs)
+
+
+def report_output_path(base_path, report_format="xlsx"):
+    """The file (xlsx) or directory (csv/parquet) open_report_writer writes for base_path."""
+    if report_format == "xlsx" and not base_path.endswith(".xlsx"):
+        return f"{base_path}.xlsx"
+    return base_path
+
+
+def write_df_to_sheet(wb, sheet_name, df):
+    """
+    Shared replacement for the per-module write_df_to_sheet copies.
+    wb can be a ReportWriter (streaming) or an in-memory openpyxl Workbook (legacy callers).
+    """
+    print(f"Writing to sheet: {sheet_name} (Rows: {len(df)})")
+    if isinstance(wb, ReportWriter):
+        wb.write_sheet(sheet_name, df)
+        return
+
+    if sheet_name in wb.sheetnames:
+        del wb[sheet_name]
+    ws = wb.create_sheet(title=sheet_name)
+    for row in iter_df_rows(df):
+        ws.append(row)
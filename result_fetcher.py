@@ -0,0 +1,106 @@
+import json
+
+import pandas as pd
+
+
+class FetchLimits:
+    """
+    Per-check ceilings for fetched result sets.
+    - batch_rows: rows per fetchmany call
+    - max_rows / max_bytes: a result stops being fetched once it reaches either ceiling
+      (bytes are estimated, see estimate_bytes); None disables that ceiling
+    """
+
+    def __init__(self, batch_rows=10000, max_rows=1000000, max_bytes=256 * 1024 * 1024):
+        self.batch_rows = batch_rows
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+
+
+_default_limits = FetchLimits()
+
+
+def get_fetch_limits():
+    return _default_limits
+
+
+def configure_fetch_limits(batch_rows=10000, max_rows=1000000, max_mb=256):
+    _default_limits.batch_rows = batch_rows
+    _default_limits.max_rows = max_rows
+    _default_limits.max_bytes = None if max_mb is None else int(max_mb * 1024 * 1024)
+    return _default_limits
+
+
+def configure_fetch_limits_from_config(config_path):
+    """Reads fetch_batch_rows / fetch_max_rows / fetch_max_mb from config.json, if present."""
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+    return configure_fetch_limits(config.get("fetch_batch_rows", 10000), config.get("fetch_max_rows", 1000000),
+                                  config.get("fetch_max_mb", 256))
+
+
+def estimate_bytes(rows):
+    # Approximate payload size: text/binary by length, every other value as 8 bytes
+    total = 0
+    for row in rows:
+        for value in row:
+            total += len(value) if isinstance(value, (str, bytes)) else 8
+    return total
+
+
+class ResultStream:
+    """
+    Executes query on cursor and yields its rows in fetchmany batches, stopping at the
+    row / byte ceilings (truncated is then True). Rows past a ceiling are never fetched,
+    so memory stays bounded by the ceiling whatever the table holds.
+    """
+
+    def __init__(self, cursor, query, max_rows=None, max_bytes=None, batch_rows=None, limits=None):
+        limits = limits or get_fetch_limits()
+        self.cursor = cursor
+        self.query = query
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.batch_rows = batch_rows or limits.batch_rows
+        self.rows_fetched = 0
+        self.bytes_fetched = 0
+        self.truncated = False
+        cursor.execute(query)
+        self.columns = [desc[0] for desc in cursor.description] if cursor.description else []
+
+    def __iter__(self):
+        while True:
+            size = self.batch_rows
+            if self.max_rows is not None:
+                size = min(size, self.max_rows - self.rows_fetched)
+                if size <= 0:
+                    # one more row tells a result that exactly fits from one that was cut off
+                    self.truncated = self.cursor.fetchone() is not None
+                    return
+            rows = self.cursor.fetchmany(size)
+            if not rows:
+                return
+            self.rows_fetched += len(rows)
+            self.bytes_fetched += estimate_bytes(rows)
+            yield rows
+            if self.max_bytes is not None and self.bytes_fetched >= self.max_bytes:
+                self.truncated = True
+                return
+
+
+def fetch_frame(cursor, query, max_rows=None, max_bytes=None, limits=None, coerce_float=True):
+    """
+    Bounded replacement for pd.read_sql / fetchall on a cursor: (DataFrame, truncated).
+    max_rows / max_bytes default to the configured per-check ceilings; coerce_float
+    turns Decimal values into floats like pd.read_sql does.
+    """
+    limits = limits or get_fetch_limits()
+    max_rows = limits.max_rows if max_rows is None else min(max_rows, limits.max_rows or max_rows)
+    max_bytes = limits.max_bytes if max_bytes is None else max_bytes
+    stream = ResultStream(cursor, query, max_rows, max_bytes, limits=limits)
+    rows = []
+    for batch in stream:
+        rows.extend(batch)
+    if stream.truncated:
+        print(f" Result cut off at {stream.rows_fetched} rows (~{stream.bytes_fetched // 1024} KB fetch ceiling)")
+    return pd.DataFrame.from_records(rows, columns=stream.columns, coerce_float=coerce_float), stream.truncated
@@ -1,71 +1,321 @@
-import os
+import math
 import pandas as pd
-from openpyxl import Workbook, load_workbook
-from openpyxl.utils.dataframe import dataframe_to_rows
-from snowflake_connection import get_snowflake_connection
+import json
+from connection_pool import get_pooled_connection
+from quantile_sketch import TDigest
+from metadata_cache import get_metadata_cache
+from report_writer import open_report_writer, write_df_to_sheet
+from sampling import load_sampling_settings, resolve_table_sample, sampling_note_df, table_ref
+from query_profiler import finish_query_profile, profile_scope, profiled, start_query_profile_from_settings
+from result_fetcher import ResultStream, configure_fetch_limits_from_config, get_fetch_limits
 
 
+@profiled("column_types")
 def get_column_types(conn, database, schema, table):
-    query = f"""
-        SELECT COLUMN_NAME, DATA_TYPE
-        FROM {database}.INFORMATION_SCHEMA.COLUMNS
-        WHERE TABLE_SCHEMA = '{schema}' AND TABLE_NAME = '{table}'
-    """
-    cur = conn.cursor()
-    cur.execute(query)
-    rows = cur.fetchall()
-    cur.close()
+    rows = get_metadata_cache().get_columns(conn, database, schema, table)
 
     categorical = [r[0] for r in rows if r[1].upper() in ('TEXT', 'VARCHAR', 'CHAR', 'STRING')]
     numeric = [r[0] for r in rows if r[1].upper() in ('NUMBER', 'FLOAT', 'INT', 'DECIMAL', 'NUMERIC', 'DOUBLE')]
     return categorical, numeric
 
 
-def get_skew_data_with_query(conn, database, schema, table, columns, top_n=3, skew_threshold=0.8):
+def build_skew_batch_query(database, schema, table, columns, top_n=3, include_total=False, sample=None):
+    # One GROUPING SETS scan per batch: each set is a single column, the
+    # optional empty set () yields the table total in the same pass.
+    grouping_sets = [f'("{col}")' for col in columns]
+    if include_total:
+        grouping_sets.append("()")
+
+    column_name_expr = "CASE " + " ".join(
+        f"WHEN GROUPING(\"{col}\") = 0 THEN '{col}'" for col in columns
+    ) + " END"
+    value_expr = "CASE " + " ".join(
+        f'WHEN GROUPING("{col}") = 0 THEN TO_VARCHAR("{col}")' for col in columns
+    ) + " END"
+
+    return f"""
+        SELECT column_name, column_value, cnt
+        FROM (
+            SELECT {column_name_expr} AS column_name,
+                   {value_expr} AS column_value,
+                   COUNT(*) AS cnt
+            FROM {table_ref(database, schema, table, sample)}
+            GROUP BY GROUPING SETS ({", ".join(grouping_sets)})
+        )
+        QUALIFY ROW_NUMBER() OVER (PARTITION BY column_name ORDER BY cnt DESC) <= {top_n}
+    """.strip()
+
+
+@profiled("skew")
+def get_skew_data_with_query(conn, database, schema, table, columns, top_n=3, skew_threshold=0.8, batch_size=50,
+                             sample=None):
+    """
+    sample: optional sampling.TableSample; counts are then extrapolated to the full table
+    and Dominance_% comes with a confidence interval.
+    """
     cur = conn.cursor()
     summary = []
+    top_values = {}
+    batch_queries = {}
+    batch_totals = {}
 
-    for col in columns:
-        query = f"""
-            SELECT "{col}", COUNT(*) as cnt
-            FROM "{database}"."{schema}"."{table}"
-            GROUP BY "{col}"
-            ORDER BY cnt DESC
-            LIMIT {top_n}
-        """.strip()
+    for start in range(0, len(columns), batch_size):
+        batch = columns[start:start + batch_size]
+        # Every batch carries its own total, so each share is over the rows its counts came from
+        query = build_skew_batch_query(database, schema, table, batch, top_n, include_total=True, sample=sample)
+        print(f" Skew scan on {table}: columns {start + 1}-{start + len(batch)} of {len(columns)}")
 
         cur.execute(query)
-        rows = cur.fetchall()
+        total_rows = 0
+        for column_name, column_value, cnt in cur.fetchall():
+            if column_name is None:
+                total_rows = cnt
+            else:
+                top_values.setdefault(column_name, []).append((column_value, cnt))
 
-        total_query = f'SELECT COUNT(*) FROM "{database}"."{schema}"."{table}"'
-        cur.execute(total_query)
-        total_rows = cur.fetchone()[0]
+        for col in batch:
+            batch_queries[col] = query
+            batch_totals[col] = total_rows
+
+    for col in columns:
+        total_rows = batch_totals[col]
+        rows = sorted(top_values.get(col, []), key=lambda r: r[1], reverse=True)
 
         top_value = rows[0][0] if rows else None
         top_count = rows[0][1] if rows else 0
         skew = "Yes" if total_rows > 0 and (top_count / total_rows) > skew_threshold else "No"
 
-        summary.append({
+        row = {
             "Column": col,
             "Top_Value": top_value,
             "Top_Count": top_count,
             "Total_Rows": total_rows,
             "Dominance_%": f"{(top_count / total_rows) * 100:.2f}%" if total_rows > 0 else "0%",
             "Skew_Detected": skew,
-            "Query_Used": query
-        })
+            "Query_Used": batch_queries[col]
+        }
+        if sample is not None:
+            _, low, high = sample.proportion(top_count, total_rows)
+            row.update(sample.count_fields("Top_Count", top_count))
+            row["Total_Rows"] = sample.table_rows
+            row["Sample_Rows"] = total_rows
+            row["Dominance_CI"] = f"{low * 100:.2f}% - {high * 100:.2f}%"
+        summary.append(row)
 
     cur.close()
     return pd.DataFrame(summary)
 
 
-def get_outlier_data_with_query(conn, database, schema, table, columns):
+def _outlier_row(col, q1, q3, outlier_count, min_outlier, max_outlier, query, sample=None):
+    iqr = q3 - q1
+    samples = [v for v in dict.fromkeys((min_outlier, max_outlier)) if v is not None]
+    row = {
+        "Column": col,
+        "Q1": q1,
+        "Q3": q3,
+        "IQR": iqr,
+        "Lower_Bound": q1 - 1.5 * iqr,
+        "Upper_Bound": q3 + 1.5 * iqr,
+        "Outlier_Count": outlier_count or 0,
+        "Sample_Outliers": ", ".join(map(str, samples)) if samples else "None",
+        "Query_Used": query
+    }
+    if sample is not None:
+        row.update(sample.count_fields("Outlier_Count", outlier_count))
+    return row
+
+
+def build_outlier_pushdown_query(database, schema, table, columns, approximate=False, sample=None):
+    # One statement and one round trip, but two scans of the table: CTE b aggregates
+    # the quartiles of every column, then the outer query re-reads the table to count
+    # the outliers and pick the extreme ones as samples.
+    percentile_exprs = []
+    for i, col in enumerate(columns):
+        for q, name in ((0.25, "q1"), (0.75, "q3")):
+            if approximate:
+                expr = f'APPROX_PERCENTILE("{col}", {q})'
+            else:
+                expr = f'PERCENTILE_CONT({q}) WITHIN GROUP (ORDER BY "{col}")'
+            percentile_exprs.append(f"{expr} AS {name}_{i}")
+
+    select_exprs = []
+    for i, col in enumerate(columns):
+        is_outlier = (
+            f't."{col}" < b.q1_{i} - 1.5 * (b.q3_{i} - b.q1_{i}) '
+            f'OR t."{col}" > b.q3_{i} + 1.5 * (b.q3_{i} - b.q1_{i})'
+        )
+        select_exprs += [
+            f"MAX(b.q1_{i})",
+            f"MAX(b.q3_{i})",
+            f"SUM(CASE WHEN {is_outlier} THEN 1 ELSE 0 END)",
+            f'MIN(CASE WHEN {is_outlier} THEN t."{col}" END)',
+            f'MAX(CASE WHEN {is_outlier} THEN t."{col}" END)',
+        ]
+
+    return f"""
+        WITH b AS (
+            SELECT {", ".join(percentile_exprs)}
+            FROM {table_ref(database, schema, table, sample)}
+        )
+        SELECT {", ".join(select_exprs)}
+        FROM {table_ref(database, schema, table, sample, alias="t")}
+        CROSS JOIN b
+    """.strip()
+
+
+def _outlier_condition(col, lower, upper):
+    # inf / nan bounds (e.g. from a digest over inf or nan values) are not valid SQL
+    # literals; a side with no finite bound never flags a value
+    sides = []
+    if lower is not None and math.isfinite(lower):
+        sides.append(f'"{col}" < {float(lower)!r}')
+    if upper is not None and math.isfinite(upper):
+        sides.append(f'"{col}" > {float(upper)!r}')
+    return " OR ".join(sides) or "1 = 0"
+
+
+def build_outlier_count_query(database, schema, table, bounds, sample=None):
+    # bounds: {column: (lower, upper)}; plain aggregates only, so it runs on any backend
+    select_exprs = []
+    for col, (lower, upper) in bounds.items():
+        is_outlier = _outlier_condition(col, lower, upper)
+        select_exprs += [
+            f"SUM(CASE WHEN {is_outlier} THEN 1 ELSE 0 END)",
+            f'MIN(CASE WHEN {is_outlier} THEN "{col}" END)',
+            f'MAX(CASE WHEN {is_outlier} THEN "{col}" END)',
+        ]
+    return f"""
+        SELECT {", ".join(select_exprs)}
+        FROM {table_ref(database, schema, table, sample)}
+    """.strip()
+
+
+def _get_outliers_pushdown(conn, database, schema, table, columns, approximate, batch_size, sample=None):
+    cur = conn.cursor()
+    summary = []
+
+    for start in range(0, len(columns), batch_size):
+        batch = columns[start:start + batch_size]
+        query = build_outlier_pushdown_query(database, schema, table, batch, approximate, sample)
+        print(f" Outlier pushdown on {table}: columns {start + 1}-{start + len(batch)} of {len(columns)}")
+        cur.execute(query)
+        result = cur.fetchone()
+
+        for i, col in enumerate(batch):
+            q1, q3, outlier_count, min_outlier, max_outlier = result[i * 5:(i + 1) * 5]
+            if q1 is None or q3 is None:
+                continue
+            summary.append(_outlier_row(col, float(q1), float(q3), outlier_count, min_outlier, max_outlier, query,
+                                        sample))
+
+    cur.close()
+    return summary
+
+
+def _get_outliers_sketch(conn, database, schema, table, columns, chunk_size, batch_size, sample=None):
     cur = conn.cursor()
     summary = []
 
+    for start in range(0, len(columns), batch_size):
+        batch = columns[start:start + batch_size]
+        stream_query = f"""
+            SELECT {", ".join(f'"{col}"' for col in batch)}
+            FROM {table_ref(database, schema, table, sample)}
+        """.strip()
+        print(f" Outlier sketch on {table}: streaming columns {start + 1}-{start + len(batch)} of {len(columns)}")
+
+        digests = [TDigest() for _ in batch]
+        cur.execute(stream_query)
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            for row in rows:
+                for digest, value in zip(digests, row):
+                    if value is not None:
+                        digest.add(value)
+
+        quartiles = {}
+        for col, digest in zip(batch, digests):
+            if digest.count:
+                quartiles[col] = (digest.quantile(0.25), digest.quantile(0.75))
+        if not quartiles:
+            continue
+
+        bounds = {
+            col: (q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1))
+            for col, (q1, q3) in quartiles.items()
+        }
+        count_query = build_outlier_count_query(database, schema, table, bounds, sample)
+        cur.execute(count_query)
+        result = cur.fetchone()
+
+        query_used = f"{stream_query};\n{count_query}"
+        for i, (col, (q1, q3)) in enumerate(quartiles.items()):
+            outlier_count, min_outlier, max_outlier = result[i * 3:(i + 1) * 3]
+            summary.append(_outlier_row(col, q1, q3, outlier_count, min_outlier, max_outlier, query_used, sample))
+
+    cur.close()
+    return summary
+
+
+@profiled("outlier")
+def get_outlier_data_with_query(conn, database, schema, table, columns, mode="pandas",
+                                approximate=False, batch_size=50, chunk_size=100000, sample=None):
+    """
+    IQR outlier profile per numeric column.
+    - mode="pandas": pulls each column into pandas (original behaviour); a column past the
+      fetch ceiling (see result_fetcher) is finished through a t-digest instead
+    - mode="pushdown": quartiles, bounds and outlier counts computed in the warehouse,
+      PERCENTILE_CONT or APPROX_PERCENTILE when approximate=True
+    - mode="sketch": for backends without percentile functions; streams the columns in
+      chunks through a t-digest and counts outliers with plain aggregates
+    sample: optional sampling.TableSample; quartiles come from the sample and outlier
+    counts are extrapolated with confidence intervals
+    """
+    if mode == "pushdown":
+        return pd.DataFrame(_get_outliers_pushdown(conn, database, schema, table, columns, approximate, batch_size,
+                                                   sample))
+    if mode == "sketch":
+        return pd.DataFrame(_get_outliers_sketch(conn, database, schema, table, columns, chunk_size, batch_size,
+                                                 sample))
+
+    cur = conn.cursor()
+    limits = get_fetch_limits()
+    summary = []
+
     for col in columns:
-        query = f'SELECT "{col}" FROM "{database}"."{schema}"."{table}" WHERE "{col}" IS NOT NULL'
-        df = pd.read_sql(query, conn)
+        query = f'SELECT "{col}" FROM {table_ref(database, schema, table, sample)} WHERE "{col}" IS NOT NULL'
+
+        # Exact quantiles while the column fits under the fetch ceiling; past it, the
+        # column streams through a t-digest and outliers are counted in the warehouse
+        stream = ResultStream(cur, query, limits=limits)
+        kept_rows = []
+        digest = None
+        for rows in stream:
+            if digest is None and ((limits.max_rows is None or stream.rows_fetched <= limits.max_rows) and
+                                   (limits.max_bytes is None or stream.bytes_fetched <= limits.max_bytes)):
+                kept_rows.extend(rows)
+                continue
+            if digest is None:
+                print(f" {table}.{col} exceeds the fetch ceiling, estimating quartiles with a t-digest")
+                digest = TDigest()
+                digest.update(r[0] for r in kept_rows)
+                kept_rows = []
+            digest.update(r[0] for r in rows)
+
+        if digest is not None:
+            q1, q3 = digest.quantile(0.25), digest.quantile(0.75)
+            count_query = build_outlier_count_query(database, schema, table,
+                                                    {col: (q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1))}, sample)
+            cur.execute(count_query)
+            outlier_count, min_outlier, max_outlier = cur.fetchone()
+            summary.append(_outlier_row(col, q1, q3, outlier_count, min_outlier, max_outlier,
+                                        f"{query};\n{count_query}", sample))
+            continue
+
+        # coerce_float like the pd.read_sql this replaces
+        df = pd.DataFrame.from_records(kept_rows, columns=[col], coerce_float=True)
 
         if df.empty:
             continue
@@ -77,7 +327,7 @@ def get_outlier_data_with_query(conn, database, schema, table, columns):
         upper = Q3 + 1.5 * IQR
         outliers = df[(df[col] < lower) | (df[col] > upper)][col].tolist()
 
-        summary.append({
+        row = {
             "Column": col,
             "Q1": Q1,
             "Q3": Q3,
@@ -87,45 +337,51 @@ def get_outlier_data_with_query(conn, database, schema, table, columns):
             "Outlier_Count": len(outliers),
             "Sample_Outliers": ", ".join(map(str, outliers[:3])) if outliers else "None",
             "Query_Used": query
-        })
+        }
+        if sample is not None:
+            row.update(sample.count_fields("Outlier_Count", len(outliers)))
+        summary.append(row)
 
     cur.close()
     return pd.DataFrame(summary)
 
 
 def write_to_excel(df, wb, sheet_name):
-    if sheet_name in wb.sheetnames:
-        del wb[sheet_name]
-    ws = wb.create_sheet(title=sheet_name)
-    for row in dataframe_to_rows(df, index=False, header=True):
-        if any(row):
-            ws.append(row)
+    write_df_to_sheet(wb, sheet_name, df)
 
 
 def run_skew_and_outlier_validation(config_path, input_excel):
-    conn, database, schema = get_snowflake_connection(config_path)
-    table_df = pd.read_excel(input_excel)
-
-    for _, row in table_df.iterrows():
-        table = row['Table']
-        print(f"\n Validating: {database}.{schema}.{table}")
-        cat_cols, num_cols = get_column_types(conn, database, schema, table)
-
-        skew_df = get_skew_data_with_query(conn, database, schema, table, cat_cols)
-        outlier_df = get_outlier_data_with_query(conn, database, schema, table, num_cols)
-
-        output_file = f"{table}_skew_outlier_check.xlsx"
-        if os.path.exists(output_file):
-            wb = load_workbook(output_file)
-        else:
-            wb = Workbook()
-            wb.remove(wb.active)
-
-        write_to_excel(skew_df, wb, "skew_check")
-        write_to_excel(outlier_df, wb, "outlier_check")
-        wb.save(output_file)
-        print(f" Results saved: {output_file}")
-
-    conn.close()
-    print("\n🔒 Snowflake connection closed.")
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+    report_format = config.get("report_format", "xlsx")
+    sampling = load_sampling_settings(config)
+    start_query_profile_from_settings(config)
+    try:
+        configure_fetch_limits_from_config(config_path)
+
+        conn, database, schema, *_ = get_pooled_connection(config_path)
+        table_df = pd.read_excel(input_excel)
+
+        for _, row in table_df.iterrows():
+            table = row['Table']
+            print(f"\n Validating: {database}.{schema}.{table}")
+            cat_cols, num_cols = get_column_types(conn, database, schema, table)
+            with profile_scope("sampling", f"{database}.{schema}.{table}"):
+                sample = resolve_table_sample(conn, database, schema, table, sampling)
+            if sample is not None:
+                print(f" Sampling {table}: {sample.describe()}")
+
+            skew_df = get_skew_data_with_query(conn, database, schema, table, cat_cols, sample=sample)
+            outlier_df = get_outlier_data_with_query(conn, database, schema, table, num_cols, sample=sample)
+
+            with open_report_writer(f"{table}_skew_outlier_check", report_format) as wb:
+                if sample is not None:
+                    write_to_excel(sampling_note_df(database, schema, table, sample), wb, "sampling_note")
+                write_to_excel(skew_df, wb, "skew_check")
+                write_to_excel(outlier_df, wb, "outlier_check")
+
+        conn.close()
+        print("\n🔒 Snowflake connection returned to pool.")
+    finally:
+        finish_query_profile("", report_format)
 
@@ -0,0 +1,179 @@
+import json
+import math
+import random
+from statistics import NormalDist
+
+import pandas as pd
+
+from metadata_cache import get_metadata_cache
+
+SAMPLE_METHODS = ("bernoulli", "system", "hash")
+HASH_BUCKETS = 1000000
+# Snowflake accepts SEED values 0 - 2147483647
+MAX_SAMPLE_SEED = 2147483647
+
+_run_seed = None
+
+
+def get_run_seed():
+    """
+    Seed used for every sample of this run when the config sets none: statements that
+    are combined (skew batches, quartiles and their outlier counts) must read the same rows.
+    """
+    global _run_seed
+    if _run_seed is None:
+        _run_seed = random.randint(0, MAX_SAMPLE_SEED)
+    return _run_seed
+
+
+def load_sampling_settings(config):
+    """
+    The "sampling" block of config.json, or None for exact mode (the default). Accepts
+    {"fraction": 0.01} or {"rows": 5000000} plus optional "method" (bernoulli | system |
+    hash), "seed" (default: one random seed per run, see get_run_seed), "confidence"
+    (default 0.95), "min_table_rows" (smaller tables run exactly) and
+    "tables": {"DB.SCHEMA.TABLE": {...overrides...}}.
+    """
+    sampling = config.get("sampling")
+    if not sampling or sampling.get("mode", "sample") == "exact":
+        return None
+    if not sampling.get("fraction") and not sampling.get("rows"):
+        raise ValueError('sampling needs "fraction" or "rows"')
+    if sampling.get("method", "bernoulli") not in SAMPLE_METHODS:
+        raise ValueError(f"Unsupported sampling method: {sampling.get('method')}")
+    return sampling
+
+
+def load_sampling_settings_from_config(config_path):
+    with open(config_path, 'r') as f:
+        return load_sampling_settings(json.load(f))
+
+
+def _table_row_count(conn, database, schema, table):
+    info = get_metadata_cache().get_table_info(conn, database, schema, table)
+    if info and info.get("ROW_COUNT") is not None:
+        return int(info["ROW_COUNT"])
+    cur = conn.cursor()
+    try:
+        cur.execute(f'SELECT COUNT(*) FROM "{database}"."{schema}"."{table}"')
+        return int(cur.fetchone()[0])
+    finally:
+        cur.close()
+
+
+def resolve_table_sample(conn, database, schema, table, sampling):
+    """TableSample for one table, or None when the table should be checked exactly."""
+    if not sampling:
+        return None
+    overrides = sampling.get("tables", {}).get(f"{database}.{schema}.{table}".upper(), {})
+    settings = {**{k: v for k, v in sampling.items() if k != "tables"}, **overrides}
+    if settings.get("mode", "sample") == "exact":
+        return None
+
+    table_rows = _table_row_count(conn, database, schema, table)
+    if table_rows <= settings.get("min_table_rows", 0) or table_rows == 0:
+        return None
+
+    if settings.get("fraction"):
+        fraction = float(settings["fraction"])
+    else:
+        # Row budget: converted to a fraction so every count has a known scale factor
+        fraction = float(settings["rows"]) / table_rows
+    if fraction >= 1:
+        return None
+
+    seed = settings.get("seed")
+    return TableSample(fraction, table_rows, settings.get("method", "bernoulli"),
+                      get_run_seed() if seed is None else seed, settings.get("confidence", 0.95))
+
+
+class TableSample:
+    """
+    A resolved sample of one table.
+    - table_ref() is the sampled replacement for "db"."schema"."table" in a FROM clause
+    - extrapolate() scales a count seen in the sample to the full table with a confidence
+      interval (Bernoulli sampling, score interval so zero counts still get an upper bound)
+    - proportion() gives a Wilson interval for a share of sampled rows
+    """
+
+    def __init__(self, fraction, table_rows, method="bernoulli", seed=None, confidence=0.95):
+        self.fraction = fraction
+        self.table_rows = table_rows
+        self.method = method
+        self.seed = seed
+        self.confidence = confidence
+        self.z = NormalDist().inv_cdf((1 + confidence) / 2)
+
+    def table_ref(self, database, schema, table, alias=None):
+        ref = f'"{database}"."{schema}"."{table}"'
+        alias_sql = f" {alias}" if alias else ""
+        percent = round(self.fraction * 100, 6)
+        if self.method == "hash":
+            threshold = max(1, int(self.fraction * HASH_BUCKETS))
+            alias_sql = f" {alias}" if alias else " sampled"
+            return f"(SELECT * FROM {ref} WHERE ABS(MOD(HASH(*), {HASH_BUCKETS})) < {threshold}){alias_sql}"
+        seed_sql = f" SEED ({int(self.seed)})" if self.seed is not None else ""
+        return f"{ref}{alias_sql} SAMPLE {self.method.upper()} ({percent}){seed_sql}"
+
+    def extrapolate(self, sample_count):
+        """(estimate, low, high) for the full-table count behind sample_count."""
+        c = float(sample_count or 0)
+        p = self.fraction
+        f = 1 - p
+        z2 = self.z ** 2
+        center = c + z2 * f / 2
+        half = self.z * math.sqrt(f * (c + z2 * f / 4))
+        low = max(c, (center - half) / p)
+        high = min(float(self.table_rows), (center + half) / p)
+        return round(c / p), round(low), round(max(high, low))
+
+    def proportion(self, successes, n):
+        """(share, low, high) Wilson interval; shares are fractions in [0, 1]."""
+        if not n:
+            return 0.0, 0.0, 0.0
+        share = successes / n
+        z2 = self.z ** 2
+        denom = 1 + z2 / n
+        center = (share + z2 / (2 * n)) / denom
+        half = self.z * math.sqrt(share * (1 - share) / n + z2 / (4 * n * n)) / denom
+        return share, max(0.0, center - half), min(1.0, center + half)
+
+    def count_fields(self, name, sample_count):
+        """Report columns for an extrapolated count: name, name_CI_Low, name_CI_High, Sample_name."""
+        estimate, low, high = self.extrapolate(sample_count)
+        return {
+            name: estimate,
+            f"{name}_CI_Low": low,
+            f"{name}_CI_High": high,
+            f"Sample_{name}": int(sample_count or 0),
+        }
+
+    def describe(self):
+        seed = f", seed {self.seed}" if self.seed is not None else ""
+        return f"{self.fraction:.4%} {self.method} sample of {self.table_rows:,} rows{seed}"
+
+
+def table_ref(database, schema, table, sample=None, alias=None):
+    """FROM-clause reference for a table, sampled when sample is a TableSample."""
+    if sample is None:
+        ref = f'"{database}"."{schema}"."{table}"'
+        return f"{ref} {alias}" if alias else ref
+    return sample.table_ref(database, schema, table, alias)
+
+
+def sampling_note_df(database, schema, table, sample):
+    """One-row frame for the report's sampling_note sheet."""
+    if sample is None:
+        return pd.DataFrame([{"Table": f"{database}.{schema}.{table}", "Mode": "Exact",
+                              "Note": "Exact results over the full table."}])
+    return pd.DataFrame([{
+        "Table": f"{database}.{schema}.{table}",
+        "Mode": "Sampled",
+        "Method": sample.method,
+        "Fraction": sample.fraction,
+        "Seed": sample.seed,
+        "Table_Rows": sample.table_rows,
+        "Confidence": sample.confidence,
+        "Note": (f"SAMPLED RESULTS ({sample.describe()}): counts are extrapolated estimates with "
+                 f"{sample.confidence:.0%} confidence intervals; run in exact mode for sign-off."),
+    }])
@@ -0,0 +1,105 @@
+import importlib.machinery
+import importlib.util
+import os
+
+import pytest
+
+from connection_pool import local_connection_factory
+from metadata_cache import get_metadata_cache
+
+duckdb = pytest.importorskip("duckdb")
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _load(name, file_name):
+    loader = importlib.machinery.SourceFileLoader(name, os.path.join(REPO, file_name))
+    module = importlib.util.module_from_spec(importlib.util.spec_from_loader(name, loader))
+    loader.exec_module(module)
+    return module
+
+
+bad_data = _load("bad_data_repat_check", "bad_data_repat_check")
+
+
+@pytest.fixture
+def cursor(tmp_path):
+    path = str(tmp_path / "LOCAL.duckdb")
+    raw = duckdb.connect(path)
+    raw.execute('CREATE SCHEMA "S"')
+    raw.execute('CREATE TABLE "S"."T" ("V" VARCHAR, "N" INTEGER)')
+    raw.execute("""INSERT INTO "S"."T" VALUES ('aaaa', 11), (' bb ', 2), ('abc', 333), ('x', 4444),
+                   (NULL, 5), ('zz', 66)""")
+    raw.close()
+    conn, _, _ = local_connection_factory("duckdb", path)()
+    cur = conn.cursor()
+    yield cur
+    cur.close()
+    conn.close()
+
+
+def test_sample_and_count_queries_flag_the_same_rows(cursor):
+    cursor.execute(bad_data.build_bad_data_count_query("LOCAL", "S", "T", ["V", "N"]))
+    counts = cursor.fetchone()
+    samples = []
+    for col in ("V", "N"):
+        cursor.execute(bad_data.build_bad_data_sample_query("LOCAL", "S", "T", col, limit=100))
+        samples.append(sorted(r[0] for r in cursor.fetchall()))
+
+    assert samples == [[" bb ", "aaaa", "zz"], [11, 66, 333, 4444]]
+    assert list(counts) == [len(s) for s in samples]
+
+
+class RejectingConnection:
+    """Fails every statement that touches column "N", like a type TRIM cannot take."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def cursor(self):
+        return RejectingCursor(self.conn.cursor())
+
+
+class RejectingCursor:
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def execute(self, query, *args):
+        if '"N"' in query:
+            raise RuntimeError("TRIM does not accept BINARY")
+        return self.cursor.execute(query, *args)
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+
+def _local_conn(tmp_path):
+    path = str(tmp_path / "LOCAL.duckdb")
+    raw = duckdb.connect(path)
+    raw.execute('CREATE SCHEMA "S"')
+    raw.execute('CREATE TABLE "S"."T" ("V" VARCHAR, "N" INTEGER, "W" VARCHAR)')
+    raw.execute("""INSERT INTO "S"."T" SELECT 'aaaa', 11, CASE WHEN range % 2 = 0 THEN 'zz' ELSE 'ok' END
+                   FROM range(20)""")
+    raw.close()
+    get_metadata_cache().invalidate("LOCAL")
+    conn, _, _ = local_connection_factory("duckdb", path)()
+    return conn
+
+
+def test_single_scan_reports_like_the_per_column_mode(tmp_path):
+    conn = _local_conn(tmp_path)
+    per_column, per_column_samples = bad_data.run_bad_data_check(conn, "LOCAL", "S", "T")
+    single_scan, single_scan_samples = bad_data.run_bad_data_check(conn, "LOCAL", "S", "T", single_scan=True)
+
+    assert per_column[["Column", "Status"]].equals(single_scan[["Column", "Status"]])
+    assert per_column["Status"].tolist() == ["5 bad rows found"] * 3
+    assert per_column_samples.equals(single_scan_samples)
+
+
+def test_failing_column_does_not_fail_its_batch(tmp_path):
+    conn = RejectingConnection(_local_conn(tmp_path))
+    summary, _ = bad_data.run_bad_data_check(conn, "LOCAL", "S", "T", single_scan=True)
+
+    status = dict(zip(summary["Column"], summary["Status"]))
+    assert status["N"].startswith("Error: TRIM does not accept BINARY")
+    assert status["V"] == status["W"] == "5 bad rows found"
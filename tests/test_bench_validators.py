@@ -0,0 +1,22 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("duckdb")
+
+BENCH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "bench_validators.py")
+
+
+def test_suite_runs_without_the_snowflake_stack(tmp_path):
+    # A fresh interpreter: only the repository and installed packages are importable
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONPATH"}
+    result = subprocess.run(
+        [sys.executable, BENCH, "--rows", "500", "--width", "6", "--repeat", "1",
+         "--baseline", str(tmp_path / "baseline.json")],
+        cwd=tmp_path, env=env, capture_output=True, text=True, timeout=300,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    for name in ("skew", "outliers_pushdown", "bad_data", "pattern", "joins", "enum", "count_comparison"):
+        assert f" Running {name} ..." in result.stdout
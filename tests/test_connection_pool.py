@@ -0,0 +1,184 @@
+import sqlite3
+
+import pytest
+
+from connection_pool import ConnectionInfo, ConnectionPool, local_connection_factory, normalize_connection_result
+
+
+class CountingFactory:
+    def __init__(self):
+        self.created = []
+
+    def __call__(self):
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.created.append(conn)
+        return conn, "DB", "PUBLIC"
+
+
+def test_normalize_connection_result_pads_to_six_fields():
+    assert normalize_connection_result("conn") == ConnectionInfo("conn", None, None, None, None, None)
+    assert normalize_connection_result(("conn", "DB", "S")) == ConnectionInfo("conn", "DB", "S", None, None, None)
+
+
+def test_released_session_is_reused():
+    factory = CountingFactory()
+    pool = ConnectionPool(factory, max_size=2)
+    info = pool.acquire()
+    assert (info.database, info.schema) == ("DB", "PUBLIC")
+    raw = info.conn.raw
+    info.conn.close()
+    info.conn.close()  # releasing twice must not park the session twice
+
+    again = pool.acquire()
+    assert again.conn.raw is raw
+    assert len(factory.created) == 1
+    assert pool._idle == []
+
+
+def test_acquire_times_out_when_all_sessions_are_checked_out():
+    pool = ConnectionPool(CountingFactory(), max_size=1, acquire_timeout=0.05)
+    with pool.connection():
+        with pytest.raises(TimeoutError):
+            pool.acquire()
+    pool.acquire()
+
+
+def test_broken_release_evicts_the_session():
+    factory = CountingFactory()
+    pool = ConnectionPool(factory, max_size=1)
+    info = pool.acquire()
+    pool.release(info.conn, broken=True)
+    with pytest.raises(sqlite3.ProgrammingError):
+        factory.created[0].execute("SELECT 1")
+
+    replacement = pool.acquire()
+    assert replacement.conn.raw is factory.created[1]
+    assert pool._open_count == 1
+
+
+def test_unhealthy_idle_session_is_replaced():
+    factory = CountingFactory()
+    pool = ConnectionPool(factory, max_size=1, health_check_interval=0)
+    info = pool.acquire()
+    info.conn.close()
+    factory.created[0].close()
+
+    replacement = pool.acquire()
+    assert replacement.conn.raw is factory.created[1]
+
+
+def test_closed_cursor_is_reused_once():
+    pool = ConnectionPool(CountingFactory())
+    conn = pool.acquire().conn
+    cur = conn.cursor()
+    raw_cursor = cur._cursor
+    cur.close()
+    cur.close()
+
+    first, second = conn.cursor(), conn.cursor()
+    assert first._cursor is raw_cursor
+    assert second._cursor is not raw_cursor
+
+
+def test_cursor_is_a_context_manager():
+    pool = ConnectionPool(CountingFactory())
+    conn = pool.acquire().conn
+    with conn.cursor() as cur:
+        cur.execute("SELECT 41 + 1")
+        assert cur.fetchone() == (42,)
+    with pytest.raises(AttributeError):
+        cur.execute("SELECT 1")
+    assert len(conn._idle_cursors) == 1
+
+
+def test_close_all_closes_idle_sessions_and_refuses_new_ones():
+    factory = CountingFactory()
+    pool = ConnectionPool(factory)
+    pool.acquire().conn.close()
+    pool.close_all()
+    with pytest.raises(sqlite3.ProgrammingError):
+        factory.created[0].execute("SELECT 1")
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+
+
+def test_local_sqlite_factory_runs_snowflake_functions(tmp_path):
+    path = str(tmp_path / "local.sqlite")
+    pool = ConnectionPool(local_connection_factory("sqlite", path, "LOCAL", "MAIN"))
+    with pool.connection() as info:
+        cur = info.conn.cursor()
+        cur.execute("SELECT TO_VARCHAR(12), REGEXP_LIKE('ab1', '[a-z]+\\\\d')")
+        assert cur.fetchone() == ("12", 1)
+        cur.close()
+    pool.close_all()
+
+
+class OperationalError(Exception):
+    """Named like the DB-API class every driver raises for a lost session."""
+
+
+class FlakyCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, query):
+        if self.conn.dead:
+            raise OperationalError("connection reset by peer")
+        if query == "bad sql":
+            raise ValueError("syntax error")
+        return self
+
+    def fetchall(self):
+        return [(1,)]
+
+    def close(self):
+        pass
+
+
+class FlakyConnection:
+    def __init__(self):
+        self.dead = False
+        self.closed = False
+
+    def cursor(self):
+        return FlakyCursor(self)
+
+    def close(self):
+        self.closed = True
+
+
+def test_connection_error_drops_the_session_on_close():
+    created = []
+    pool = ConnectionPool(lambda: created.append(FlakyConnection()) or created[-1], max_size=1)
+    conn = pool.acquire().conn
+    created[0].dead = True
+    cur = conn.cursor()
+    with pytest.raises(OperationalError):
+        cur.execute("SELECT 1")
+    cur.close()
+    conn.close()
+
+    assert created[0].closed
+    replacement = pool.acquire().conn
+    assert replacement.raw is created[1]
+    with replacement.cursor() as cur:
+        assert cur.execute("SELECT 1").fetchall() == [(1,)]
+
+
+def test_query_errors_keep_the_session():
+    created = []
+    pool = ConnectionPool(lambda: created.append(FlakyConnection()) or created[-1], max_size=1)
+    conn = pool.acquire().conn
+    with conn.cursor() as cur:
+        with pytest.raises(ValueError):
+            cur.execute("bad sql")
+    conn.close()
+
+    assert not created[0].closed
+    assert pool.acquire().conn.raw is created[0]
+
+
+def test_execute_returns_the_pooled_cursor():
+    pool = ConnectionPool(CountingFactory())
+    cur = pool.acquire().conn.cursor()
+    assert cur.execute("SELECT 1") is cur
@@ -0,0 +1,44 @@
+import importlib.machinery
+import importlib.util
+import os
+
+import pytest
+
+from connection_pool import local_connection_factory
+
+duckdb = pytest.importorskip("duckdb")
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def distinct(tmp_path, monkeypatch):
+    # the script creates its output directory on import
+    monkeypatch.chdir(tmp_path)
+    name = "distinct_column_validation_script"
+    loader = importlib.machinery.SourceFileLoader(name, os.path.join(REPO, "distinct column validation script"))
+    module = importlib.util.module_from_spec(importlib.util.spec_from_loader(name, loader))
+    loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def conn(tmp_path):
+    path = str(tmp_path / "LOCAL.duckdb")
+    raw = duckdb.connect(path)
+    raw.execute('CREATE SCHEMA "S"')
+    raw.execute('CREATE TABLE "S"."T" ("ID" INTEGER, "CODE" VARCHAR, "AMOUNT" DOUBLE)')
+    raw.execute("""INSERT INTO "S"."T" SELECT i, 'C' || (i % 3), (i % 2) * 1.5 FROM range(100) t(i)""")
+    raw.close()
+    conn, _, _ = local_connection_factory("duckdb", path)()
+    return conn
+
+
+def test_each_column_is_capped_at_the_limit(distinct, conn):
+    values = distinct.sample_distinct_values(conn, '"LOCAL"."S"."T"', ["ID", "CODE", "AMOUNT"], limit=5,
+                                             batch_size=2)
+
+    assert len(values["ID"]) == 5 and len(set(values["ID"])) == 5
+    assert all(isinstance(v, int) for v in values["ID"])
+    assert sorted(values["CODE"]) == ["C0", "C1", "C2"]
+    assert sorted(values["AMOUNT"]) == [0.0, 1.5]
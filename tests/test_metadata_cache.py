@@ -0,0 +1,64 @@
+import threading
+import time
+
+from metadata_cache import MetadataCache
+
+
+class SlowSchemaCache(MetadataCache):
+    """Stands in for the INFORMATION_SCHEMA queries; SLOW schemas block until released."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.release_slow = threading.Event()
+        self.slow_started = threading.Event()
+        self.queries = []
+
+    def _query_schema(self, conn, database, schema):
+        self.queries.append((database, schema))
+        if schema == "SLOW":
+            self.slow_started.set()
+            assert self.release_slow.wait(5)
+        return {"loaded_at": time.time(), "columns": {"T": [["ID", "NUMBER"]]}, "tables": {"T": {}}}
+
+
+def test_slow_schema_load_does_not_block_other_schemas():
+    cache = SlowSchemaCache()
+    slow = threading.Thread(target=cache.load_schema, args=(None, "DB", "SLOW"))
+    slow.start()
+    assert cache.slow_started.wait(5)
+    try:
+        done = threading.Event()
+        other = threading.Thread(target=lambda: (cache.get_columns(None, "DB", "FAST", "T"), done.set()))
+        other.start()
+        assert done.wait(2), "loading DB.FAST waited for DB.SLOW"
+        other.join()
+    finally:
+        cache.release_slow.set()
+        slow.join()
+
+
+def test_concurrent_loads_of_one_schema_query_once():
+    cache = SlowSchemaCache()
+    threads = [threading.Thread(target=cache.load_schema, args=(None, "DB", "SLOW")) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    assert cache.slow_started.wait(5)
+    cache.release_slow.set()
+    for thread in threads:
+        thread.join()
+    assert cache.queries == [("DB", "SLOW")]
+
+
+def test_refresh_and_disk_round_trip(tmp_path):
+    cache = SlowSchemaCache(cache_dir=str(tmp_path))
+    assert cache.get_column_type(None, "DB", "S", "T", "ID") == "NUMBER"
+    assert cache.get_column_type(None, "DB", "S", "T", "ID") == "NUMBER"
+    assert cache.queries == [("DB", "S")]
+
+    # a new process reads the persisted entry instead of querying
+    fresh = SlowSchemaCache(cache_dir=str(tmp_path))
+    assert fresh.table_exists(None, "DB", "S", "T")
+    assert fresh.queries == []
+
+    fresh.load_schema(None, "DB", "S", refresh=True)
+    assert fresh.queries == [("DB", "S")]
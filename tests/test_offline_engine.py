@@ -0,0 +1,67 @@
+import importlib.machinery
+import importlib.util
+import json
+import os
+
+import pytest
+
+from connection_pool import get_pooled_connection
+from metadata_cache import get_metadata_cache
+from offline_engine import build_extract_catalog
+
+duckdb = pytest.importorskip("duckdb")
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+loader = importlib.machinery.SourceFileLoader("pattern", os.path.join(REPO, "pattern"))
+pattern = importlib.util.module_from_spec(importlib.util.spec_from_loader("pattern", loader))
+loader.exec_module(pattern)
+
+
+@pytest.fixture
+def extracts(tmp_path):
+    directory = tmp_path / "extracts"
+    directory.mkdir()
+    raw = duckdb.connect()
+    raw.execute(f"""COPY (SELECT * FROM (VALUES ('a@b.com', '5551234567'), ('nope', '555'))
+                    t("EMAIL", "PHONE")) TO '{directory / "customers.parquet"}' (FORMAT PARQUET)""")
+    raw.close()
+    (directory / "orders.csv").write_text("ORDER_ID,ZIP\n1,12345\n2,1234\nx,99999\n")
+    return directory
+
+
+@pytest.fixture
+def config_path(tmp_path, extracts):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({
+        "backend": "extracts",
+        "extracts": {"directory": str(extracts), "catalog_path": str(tmp_path / "catalog" / "EXTRACTS.duckdb")},
+    }))
+    get_metadata_cache().invalidate("EXTRACTS")
+    return str(path)
+
+
+def test_catalog_has_a_view_per_extract(config_path):
+    with open(config_path) as f:
+        catalog_path = build_extract_catalog(json.load(f))
+
+    conn = duckdb.connect(catalog_path, read_only=True)
+    try:
+        assert conn.execute('SELECT COUNT(*) FROM "PUBLIC"."CUSTOMERS"').fetchone()[0] == 2
+        assert conn.execute('SELECT COUNT(*) FROM "PUBLIC"."ORDERS"').fetchone()[0] == 3
+    finally:
+        conn.close()
+
+
+def test_pattern_validation_runs_on_the_extracts(config_path):
+    conn, database, schema, *_ = get_pooled_connection(config_path)
+    try:
+        assert (database, schema) == ("EXTRACTS", "PUBLIC")
+        customers, _ = pattern.run_pattern_validation(conn, database, schema, "CUSTOMERS", ["EMAIL", "PHONE"])
+        orders, invalid = pattern.run_pattern_validation(conn, database, schema, "ORDERS", ["ORDER_ID", "ZIP"])
+    finally:
+        conn.close()
+
+    assert dict(zip(customers["Column"], customers["Invalid_Count"])) == {"EMAIL": 1, "PHONE": 1}
+    assert dict(zip(orders["Column"], orders["Invalid_Count"])) == {"ORDER_ID": 1, "ZIP": 1}
+    assert sorted(invalid["Validation_Column"]) == ["ORDER_ID", "ZIP"]
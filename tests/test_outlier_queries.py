@@ -0,0 +1,45 @@
+import math
+
+import numpy as np
+import pytest
+
+from run_skew_and_outlier_validation import build_outlier_count_query, build_outlier_pushdown_query
+
+duckdb = pytest.importorskip("duckdb")
+
+
+@pytest.fixture
+def conn():
+    conn = duckdb.connect()
+    conn.execute('CREATE SCHEMA "S"')
+    conn.execute('CREATE TABLE "S"."T" AS SELECT range::DOUBLE AS "V" FROM range(100)')
+    conn.execute('INSERT INTO "S"."T" VALUES (1000), (-500)')
+    yield conn
+    conn.close()
+
+
+def _run(conn, query):
+    return conn.execute(query).fetchone()
+
+
+def test_count_query_matches_the_bounds(conn):
+    query = build_outlier_count_query("memory", "S", "T", {"V": (-10.0, 150.0)})
+    assert _run(conn, query) == (2, -500.0, 1000.0)
+
+
+@pytest.mark.parametrize("bounds, expected", [
+    ((-math.inf, 150.0), (1, 1000.0, 1000.0)),
+    ((-10.0, math.inf), (1, -500.0, -500.0)),
+    ((math.nan, math.nan), (0, None, None)),
+])
+def test_count_query_renders_non_finite_bounds_as_open(conn, bounds, expected):
+    query = build_outlier_count_query("memory", "S", "T", {"V": bounds})
+    assert "inf" not in query and "nan" not in query
+    assert _run(conn, query) == expected
+
+
+def test_pushdown_query_flags_the_iqr_outliers(conn):
+    q1, q3, count, low, high = _run(conn, build_outlier_pushdown_query("memory", "S", "T", ["V"]))
+    values = list(range(100)) + [1000, -500]
+    assert (q1, q3) == pytest.approx((np.percentile(values, 25), np.percentile(values, 75)))
+    assert (count, low, high) == (2, -500.0, 1000.0)
@@ -0,0 +1,52 @@
+import importlib.machinery
+import importlib.util
+import os
+
+import pytest
+
+from connection_pool import local_connection_factory
+from metadata_cache import get_metadata_cache
+
+duckdb = pytest.importorskip("duckdb")
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _load(name, file_name):
+    loader = importlib.machinery.SourceFileLoader(name, os.path.join(REPO, file_name))
+    module = importlib.util.module_from_spec(importlib.util.spec_from_loader(name, loader))
+    loader.exec_module(module)
+    return module
+
+
+pattern = _load("pattern", "pattern")
+
+
+@pytest.fixture
+def conn(tmp_path):
+    path = str(tmp_path / "LOCAL.duckdb")
+    raw = duckdb.connect(path)
+    raw.execute('CREATE SCHEMA "S"')
+    raw.execute('CREATE TABLE "S"."T" ("EMAIL" VARCHAR, "CODE" VARCHAR, "PHONE" VARCHAR)')
+    raw.execute("""INSERT INTO "S"."T" VALUES ('a@b.com', 'AB12', '555'), ('nope', 'x', '556'),
+                   ('c@d.org', 'CD34', 'n/a')""")
+    raw.close()
+    get_metadata_cache().invalidate("LOCAL")
+    conn, _, _ = local_connection_factory("duckdb", path)()
+    return conn
+
+
+def test_invalid_counts_and_samples(conn):
+    summary, invalid = pattern.run_pattern_validation(
+        conn, "LOCAL", "S", "T", {"EMAIL": None, "CODE": r"[A-Z]{2}\d{2}", "MISSING": r"\d+"})
+
+    assert dict(zip(summary["Column"], summary["Invalid_Count"])) == {"EMAIL": 1, "CODE": 1}
+    assert sorted(invalid["Validation_Column"]) == ["CODE", "EMAIL"]
+
+
+def test_bad_regex_only_fails_its_own_column(conn):
+    summary, _ = pattern.run_pattern_validation(
+        conn, "LOCAL", "S", "T", {"EMAIL": None, "CODE": "([A-Z", "PHONE": r"\d+"})
+
+    counts = dict(zip(summary["Column"], summary["Invalid_Count"]))
+    assert counts == {"EMAIL": 1, "CODE": "Error", "PHONE": 1}
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from quantile_sketch import TDigest
+
+QUANTILES = (0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99)
+
+
+def _digest(values, **kwargs):
+    digest = TDigest(**kwargs)
+    digest.update(values.tolist())
+    return digest
+
+
+@pytest.mark.parametrize("values", [
+    np.random.default_rng(1).uniform(0, 1000, 200000),
+    np.random.default_rng(2).normal(50, 10, 200000),
+    np.random.default_rng(3).lognormal(4, 1.2, 200000),
+], ids=["uniform", "normal", "lognormal"])
+def test_quantiles_match_numpy_percentile(values):
+    digest = _digest(values)
+    assert digest.count == len(values)
+    for q in QUANTILES:
+        assert digest.quantile(q) == pytest.approx(np.percentile(values, q * 100), rel=0.005), q
+
+
+def test_discrete_values_land_within_one_percent_of_rank():
+    # numpy interpolates between neighbouring ranks, the digest between centroids, so
+    # with few distinct values compare by rank rather than by value
+    values = np.random.default_rng(4).integers(0, 12, 200000).astype(float)
+    digest = _digest(values)
+    for q in QUANTILES:
+        low, high = np.percentile(values, [max(q - 0.01, 0) * 100, min(q + 0.01, 1) * 100])
+        assert low <= digest.quantile(q) <= high, q
+
+
+def test_quartiles_are_accurate_to_well_under_one_percent():
+    values = np.random.default_rng(5).normal(100, 15, 500000)
+    digest = _digest(values)
+    for q in (0.25, 0.75):
+        assert digest.quantile(q) == pytest.approx(np.percentile(values, q * 100), rel=0.001)
+
+
+def test_small_inputs_are_exact_at_the_ends():
+    values = np.array([3.0, 1.0, 2.0])
+    digest = _digest(values)
+    assert digest.quantile(0) == 1.0
+    assert digest.quantile(1) == 3.0
+    assert digest.quantile(0.5) == pytest.approx(np.percentile(values, 50))
+
+
+def test_constant_and_empty_inputs():
+    assert TDigest().quantile(0.5) is None
+    digest = _digest(np.full(10000, 7.5))
+    assert digest.quantile(0.25) == digest.quantile(0.75) == 7.5
+
+
+def test_memory_stays_bounded():
+    digest = _digest(np.random.default_rng(6).uniform(size=300000), buffer_size=1000)
+    digest.quantile(0.5)
+    assert len(digest.centroids) < 2000
+    assert digest.buffer == []
+
+
+def test_none_values_are_skipped():
+    digest = TDigest()
+    digest.update([1.0, None, 2.0, None, 3.0])
+    assert digest.count == 3
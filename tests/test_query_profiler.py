@@ -0,0 +1,73 @@
+import time
+
+import pytest
+
+from query_profiler import ProfiledConnection, profile_scope, start_query_profile, stop_query_profile
+
+
+class SlowCursor:
+    """DB-API cursor whose rows each take `delay` seconds to arrive."""
+
+    def __init__(self, rows, delay):
+        self.rows = rows
+        self.delay = delay
+
+    def execute(self, query):
+        return self
+
+    def __iter__(self):
+        for row in self.rows:
+            time.sleep(self.delay)
+            yield row
+
+    def fetchall(self):
+        time.sleep(self.delay * len(self.rows))
+        return list(self.rows)
+
+
+class SlowConnection:
+    def __init__(self, rows, delay):
+        self.rows = rows
+        self.delay = delay
+
+    def cursor(self):
+        return SlowCursor(self.rows, self.delay)
+
+
+@pytest.fixture
+def profiler():
+    profiler = start_query_profile("test")
+    yield profiler
+    stop_query_profile()
+
+
+def test_iteration_time_includes_the_fetch(profiler):
+    cur = ProfiledConnection(SlowConnection([(1,), (2,), (3,)], 0.02)).cursor()
+    with profile_scope("null", "DB.S.T"):
+        cur.execute("SELECT v FROM t")
+        assert list(cur) == [(1,), (2,), (3,)]
+
+    record, = profiler.records
+    assert (record["Validator"], record["Table"], record["Rows"]) == ("null", "DB.S.T", 3)
+    assert record["Wall_Seconds"] >= 0.05
+
+
+def test_fetchall_and_totals(profiler):
+    conn = ProfiledConnection(SlowConnection([("a",), ("bb",)], 0.01))
+    for validator in ("skew", "skew", "outlier"):
+        with profile_scope(validator):
+            cur = conn.cursor()
+            cur.execute(f"SELECT '{validator}'")
+            cur.fetchall()
+
+    totals = profiler.validator_totals_df().set_index("Validator")
+    assert totals.loc["skew", "Queries"] == 2
+    assert totals.loc["skew", "Distinct_Queries"] == 1
+    assert totals.loc["outlier", "Rows"] == 2
+    assert totals.loc["outlier", "Bytes"] == 3
+
+
+def test_nothing_is_recorded_without_an_active_profile():
+    cur = ProfiledConnection(SlowConnection([(1,)], 0)).cursor()
+    cur.execute("SELECT 1")
+    assert list(cur) == [(1,)]
@@ -0,0 +1,33 @@
+import sqlite3
+import threading
+
+from query_profiler import ProfiledConnection, profile_scope, start_query_profile, stop_query_profile
+from query_scheduler import ThreadedCursorBackend, run_queries
+
+
+def _factory():
+    return ProfiledConnection(sqlite3.connect(":memory:", check_same_thread=False))
+
+
+def test_results_come_back_in_submission_order_with_errors_in_place():
+    with ThreadedCursorBackend(_factory, max_workers=4) as backend:
+        results = run_queries(backend, ["SELECT 1", "SELECT * FROM missing", "SELECT 3"], max_in_flight=2)
+    assert results[0] == [(1,)] and results[2] == [(3,)]
+    assert isinstance(results[1], sqlite3.OperationalError)
+
+
+def test_worker_queries_keep_the_profile_scope():
+    profiler = start_query_profile("test")
+    try:
+        with ThreadedCursorBackend(_factory, max_workers=2) as backend, profile_scope("join", "DB.S.T"):
+            run_queries(backend, ["SELECT 1", "SELECT 2"])
+    finally:
+        stop_query_profile()
+    assert {(r["Validator"], r["Table"]) for r in profiler.records} == {("join", "DB.S.T")}
+
+
+def test_context_manager_shuts_the_workers_down():
+    before = threading.active_count()
+    with ThreadedCursorBackend(_factory, max_workers=3) as backend:
+        run_queries(backend, ["SELECT 1"] * 6)
+    assert threading.active_count() == before
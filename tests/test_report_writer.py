@@ -0,0 +1,78 @@
+import datetime
+import decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import report_writer
+from report_writer import open_report_writer, write_df_to_sheet
+
+
+def _report_df():
+    return pd.DataFrame({
+        "Column": ["A", "B", "C"],
+        "Outlier_Count": [3, 0, 12],
+        "Q1": [1.5, np.nan, 2.25],
+        "Skew_Detected": [True, False, True],
+        "Loaded_At": pd.to_datetime(["2024-01-01", "2024-01-02", None]),
+        "Amount": [decimal.Decimal("1.10"), None, decimal.Decimal("2.20")],
+        "Top_Value": [1, "x", datetime.date(2024, 1, 1)],  # mixed: stored as text
+        "Empty": [None, None, None],
+    })
+
+
+def test_parquet_keeps_native_dtypes(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(report_writer, "CHUNK_ROWS", 2)  # several row groups, one schema
+    with open_report_writer(str(tmp_path / "report"), "parquet") as wb:
+        write_df_to_sheet(wb, "outlier_check", _report_df())
+
+    df = pd.read_parquet(tmp_path / "report" / "outlier_check.parquet")
+    assert df["Outlier_Count"].dtype == np.int64
+    assert df["Q1"].dtype == np.float64 and np.isnan(df["Q1"][1])
+    assert df["Skew_Detected"].dtype == bool
+    assert pd.api.types.is_datetime64_any_dtype(df["Loaded_At"])
+    assert df["Amount"][0] == decimal.Decimal("1.10") and df["Amount"][1] is None
+    assert df["Top_Value"].tolist() == ["1", "x", "2024-01-01"]
+    assert df["Empty"].isna().all()
+
+
+def test_parquet_empty_sheet_keeps_its_columns(tmp_path):
+    pytest.importorskip("pyarrow")
+    with open_report_writer(str(tmp_path / "report"), "parquet") as wb:
+        write_df_to_sheet(wb, "skew_check", pd.DataFrame({"Column": pd.Series([], dtype=str),
+                                                          "Top_Count": pd.Series([], dtype="int64")}))
+    df = pd.read_parquet(tmp_path / "report" / "skew_check.parquet")
+    assert list(df.columns) == ["Column", "Top_Count"] and df.empty
+
+
+def test_csv_writes_one_file_per_sheet(tmp_path):
+    with open_report_writer(str(tmp_path / "report"), "csv") as wb:
+        write_df_to_sheet(wb, "outlier_check", _report_df()[["Column", "Outlier_Count", "Q1"]])
+    df = pd.read_csv(tmp_path / "report" / "outlier_check.csv")
+    assert df["Outlier_Count"].tolist() == [3, 0, 12]
+    assert np.isnan(df["Q1"][1])
+
+
+def test_xlsx_replaces_rewritten_sheets_and_keeps_the_others(tmp_path):
+    base = str(tmp_path / "report")
+    with open_report_writer(base) as wb:
+        write_df_to_sheet(wb, "first", pd.DataFrame({"a": [1]}))
+        write_df_to_sheet(wb, "second", pd.DataFrame({"b": [2]}))
+    with open_report_writer(base) as wb:
+        write_df_to_sheet(wb, "second", pd.DataFrame({"b": [3]}))
+
+    sheets = pd.read_excel(f"{base}.xlsx", sheet_name=None)
+    assert list(sheets) == ["first", "second"]
+    assert sheets["first"]["a"].tolist() == [1]
+    assert sheets["second"]["b"].tolist() == [3]
+
+
+def test_failed_report_is_not_saved(tmp_path):
+    base = str(tmp_path / "report")
+    with pytest.raises(RuntimeError):
+        with open_report_writer(base) as wb:
+            write_df_to_sheet(wb, "first", pd.DataFrame({"a": [1]}))
+            raise RuntimeError("validator failed")
+    assert not (tmp_path / "report.xlsx").exists()
@@ -0,0 +1,33 @@
+import importlib.machinery
+import importlib.util
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("openpyxl")
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+loader = importlib.machinery.SourceFileLoader("searc", os.path.join(REPO, "searc"))
+searc = importlib.util.module_from_spec(importlib.util.spec_from_loader("searc", loader))
+loader.exec_module(searc)
+
+
+def test_summary_has_a_row_per_listed_script(tmp_path, monkeypatch):
+    source = tmp_path / "src"
+    (source / "sub").mkdir(parents=True)
+    (source / "sub" / "a.sql").write_text("select 1;")
+    excel = tmp_path / "scripts.xlsx"
+    pd.DataFrame({"Script_Name": ["a.sql", "missing.sql", " a.sql", None]}).to_excel(excel, index=False)
+
+    copies = []
+    real_copy = searc.shutil.copy
+    monkeypatch.setattr(searc.shutil, "copy", lambda src, dst: copies.append(src) or real_copy(src, dst))
+    summary = searc.copy_sql_scripts_from_list(str(excel), str(source), str(tmp_path / "out"),
+                                               summary_output=str(tmp_path / "summary.xlsx"))
+
+    assert summary["Script_Name"].tolist() == ["a.sql", "missing.sql", "a.sql"]
+    assert summary["Status"].tolist() == ["Copied", "Not Found", "Copied"]
+    assert len(copies) == 1
+    assert (tmp_path / "out" / "a.sql").read_text() == "select 1;"
@@ -0,0 +1,39 @@
+import io
+
+import pytest
+
+from sql_cleaner_advanced import advanced_clean_sql, iter_clean_statements, iter_clean_statements_from_file
+
+
+@pytest.mark.parametrize("sql", [
+    "select a from t left   outer\n join u on t.x=u.x group\n   by a order   by a",
+    "select a from t full\touter join u on t.x = u.x",
+    "select a from t inner\n\njoin u on t.x = u.x where a is   not null",
+    "select a from t union   all select a from u",
+])
+def test_fast_mode_matches_default_on_multi_word_keywords(sql):
+    assert advanced_clean_sql(sql, fast=True) == advanced_clean_sql(sql)
+
+
+def test_fast_mode_collapses_keyword_whitespace():
+    sql = "select a from t left   outer\n join u on t.x=u.x group\n   by a order   by a"
+    assert advanced_clean_sql(sql, fast=True) == \
+        "SELECT a FROM t LEFT OUTER JOIN u ON t.x = u.x GROUP BY a ORDER BY a"
+
+
+@pytest.mark.parametrize("block_lines", [1, 2, 3, 5, 100])
+@pytest.mark.parametrize("sql", [
+    "insert into t values ('a;\nb');\nselect 1;\n",
+    "insert into t values ('x', 'a;\n\nb;\nc');\nselect 'd;\n' from u;\n",
+    "select 1; /* note;\nstill comment; */ select 2;\nselect 3;\n",
+    "select a\nfrom t\nwhere b = 1;\n\nselect c from u;\n",
+])
+def test_streaming_matches_whole_text_at_any_block_boundary(sql, block_lines):
+    streamed = list(iter_clean_statements_from_file(io.StringIO(sql), block_lines=block_lines))
+    assert streamed == list(iter_clean_statements(sql))
+
+
+def test_streaming_keeps_newlines_inside_literals():
+    sql = "insert into t values ('a;\nb');\n"
+    streamed = list(iter_clean_statements_from_file(io.StringIO(sql), block_lines=1))
+    assert streamed == ["INSERT INTO t VALUES ('a;\nb');"]
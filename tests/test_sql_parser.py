@@ -0,0 +1,22 @@
+from sql_parser import extract_joins_from_sql
+
+CHAINED = """
+SELECT o.id FROM sales.orders o
+JOIN sales.customers c ON c.id = o.customer_id
+LEFT JOIN sales.regions r ON r.id = c.region_id;
+"""
+
+
+def test_chained_joins_take_the_left_table_from_the_on_condition():
+    joins = extract_joins_from_sql(CHAINED)
+    assert [(j["left_table"], j["right_table"], j["left_keys"], j["right_keys"], j["join_type"]) for j in joins] == [
+        ("sales.orders", "sales.customers", ["customer_id"], ["id"], "INNER JOIN"),
+        ("sales.customers", "sales.regions", ["region_id"], ["id"], "LEFT JOIN"),
+    ]
+
+
+def test_fast_mode_sees_the_first_join_per_from_with_the_same_join_types():
+    sql = "SELECT * FROM a x INNER JOIN b y ON x.id = y.id; SELECT * FROM c z LEFT JOIN d w ON z.k = w.k;"
+    slow = extract_joins_from_sql(sql)
+    assert extract_joins_from_sql(sql, fast=True) == [dict(j, left_table=t) for j, t in zip(slow, ("a", "c"))]
+    assert len(extract_joins_from_sql(CHAINED, fast=True)) == 1
@@ -0,0 +1,33 @@
+import time
+
+import validation_manifest
+from metadata_cache import MetadataCache
+from validation_manifest import ValidationManifest
+
+
+class MixedCaseCache(MetadataCache):
+    """A quoted mixed-case schema and table, as INFORMATION_SCHEMA reports them."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.queries = []
+
+    def _query_schema(self, conn, database, schema):
+        self.queries.append((database, schema))
+        tables = {}
+        if schema == "Sales":
+            tables["Orders"] = {"TABLE_TYPE": "BASE TABLE", "ROW_COUNT": 10, "BYTES": 2048,
+                                "LAST_ALTERED": "2026-01-01 00:00:00"}
+        return {"loaded_at": time.time(), "columns": {}, "tables": tables}
+
+
+def test_fingerprint_uses_the_names_as_listed(tmp_path, monkeypatch):
+    cache = MixedCaseCache()
+    monkeypatch.setattr(validation_manifest, "get_metadata_cache", lambda: cache)
+    manifest = ValidationManifest(str(tmp_path / "manifest.json"), "sig")
+
+    assert manifest.fingerprint(None, "DB", "Sales", "Orders") == {
+        "ROW_COUNT": 10, "BYTES": 2048, "LAST_ALTERED": "2026-01-01 00:00:00"}
+    assert manifest.fingerprint(None, "DB", "Sales", "Orders") is not None
+    # refreshed once per schema, under the same key the validators use
+    assert cache.queries == [("DB", "Sales")]
@@ -0,0 +1,100 @@
+import datetime
+import hashlib
+import json
+import os
+import threading
+
+from metadata_cache import get_metadata_cache
+
+FINGERPRINT_FIELDS = ("ROW_COUNT", "BYTES", "LAST_ALTERED")
+
+
+def settings_signature(settings):
+    """Hash of the validation settings; a manifest written under other settings is not reused."""
+    payload = json.dumps(settings, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def table_key(database, schema, table):
+    return f"{database}.{schema}.{table}".upper()
+
+
+class ValidationManifest:
+    """
+    Checkpoint file for run_validation.
+    - each successfully validated table is recorded with its fingerprint
+      (ROW_COUNT, BYTES, LAST_ALTERED from INFORMATION_SCHEMA.TABLES) as soon as it finishes
+    - a rerun skips tables whose fingerprint is unchanged and whose report still exists,
+      so an interrupted run resumes at the first unfinished table
+    - tables without usable metadata (no fingerprint) are always revalidated
+    """
+
+    def __init__(self, path, signature):
+        self.path = path
+        self.signature = signature
+        self._tables = {}
+        self._refreshed_schemas = set()
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("settings_signature") == self.signature:
+            self._tables = data.get("tables", {})
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"settings_signature": self.signature, "tables": self._tables}, f, indent=2, default=str)
+        os.replace(tmp_path, self.path)
+
+    def fingerprint(self, conn, database, schema, table):
+        """Current fingerprint of the table, or None when the engine exposes no size/version metadata."""
+        # same keys as the metadata cache and the validators: names exactly as listed in the input
+        schema_key = (database, schema)
+        with self._lock:
+            refresh = schema_key not in self._refreshed_schemas
+            self._refreshed_schemas.add(schema_key)
+        # One metadata refresh per schema per run; later tables are served from the cache
+        info = get_metadata_cache().get_table_info(conn, database, schema, table, refresh=refresh)
+        if info is None:
+            return None
+        fingerprint = {field: info.get(field) for field in FINGERPRINT_FIELDS}
+        if all(value is None for value in fingerprint.values()):
+            return None
+        return fingerprint
+
+    def previous_result(self, database, schema, table, fingerprint, output_path):
+        """The recorded result when the table can be skipped, else None."""
+        if fingerprint is None:
+            return None
+        with self._lock:
+            entry = self._tables.get(table_key(database, schema, table))
+        if not entry or entry.get("fingerprint") != fingerprint:
+            return None
+        if not os.path.exists(output_path):
+            return None
+        return entry["result"]
+
+    def record(self, database, schema, table, fingerprint, result):
+        """Checkpoints a finished table; failed tables are dropped so they are retried next run."""
+        key = table_key(database, schema, table)
+        with self._lock:
+            if result.get("Status") == "Success" and fingerprint is not None:
+                self._tables[key] = {
+                    "fingerprint": fingerprint,
+                    "result": result,
+                    "completed_at": datetime.datetime.now().isoformat(timespec="seconds"),
+                }
+            else:
+                self._tables.pop(key, None)
+            self._save()